@@ -0,0 +1,69 @@
+import numpy as np
+
+class InferenceBroker:
+    """
+    Drives many games against one model with batched forward passes.
+    `q_values` maps a [N, F] float32 batch to [N, actions] Q-values, e.g. MonopolyExpert.q_values.
+
+    Each game is a generator (coroutine): it yields a request whenever it needs a
+    decision, is suspended until every other waiting game has yielded too, and is then
+    resumed with its action via send(). Whatever the generator returns is its result.
+
+    `encode` turns the list of pending requests into a [N, F] float32 batch. By default
+    requests are state vectors and are stacked; with StateEncoder.encode_batch games can
+    yield (player, all_players, board_spaces) and be encoded in one pass.
+    """
+
+    def __init__(self, q_values, max_batch=256, encode=None):
+        self.q_values = q_values
+        self.max_batch = max_batch
+        self.encode = encode or (lambda states: np.stack(states).astype(np.float32, copy=False))
+        self.forward_passes = 0
+        self.decisions = 0
+
+    def decide(self, states: np.ndarray) -> np.ndarray:
+        """Greedy actions for a [N, F] batch of states in one forward pass."""
+        q_values = self.q_values(states)
+        self.forward_passes += 1
+        self.decisions += len(states)
+        return q_values.argmax(axis=1)
+
+    def run(self, games) -> list:
+        """
+        Plays an iterable of game generators to completion and returns their results
+        in input order. At most `max_batch` games are in flight; as one finishes the
+        next is started, so the batch stays full until the iterable runs out.
+        """
+        games = iter(games)
+        results = {}
+        active = []   # (index, generator, pending request)
+        next_index = 0
+
+        def start(index, game, action=None):
+            # Advance a game to its next decision (or completion)
+            try:
+                request = next(game) if action is None else game.send(action)
+                active.append((index, game, request))
+            except StopIteration as done:
+                results[index] = done.value
+
+        while True:
+            # 1. Top up the batch with new games
+            while len(active) < self.max_batch:
+                game = next(games, None)
+                if game is None:
+                    break
+                start(next_index, game)
+                next_index += 1
+            if not active:
+                break
+
+            # 2. One forward pass answers every waiting game
+            batch, active = active, []
+            actions = self.decide(self.encode([request for _, _, request in batch]))
+
+            # 3. Resume each game with its action
+            for (index, game, _), action in zip(batch, actions):
+                start(index, game, int(action))
+
+        return [results[i] for i in range(next_index)]
@@ -0,0 +1,110 @@
+import copy
+import os
+import queue
+import random
+import threading
+import numpy as np
+import torch
+from core.io import atomic_write
+
+# --- TRAINING CHECKPOINTS ---
+# A checkpoint is everything train() needs to continue exactly where it stopped: model and
+# Adam state, epsilon, the episode index, every RNG (Python, NumPy, torch, the engine's dice
+# and decks) and optionally the replay buffer. capture() snapshots it in the training thread
+# (tensors and arrays are copied, so training can go on mutating them); Checkpointer writes
+# it from a background thread to a temp file that is renamed into place, so a run killed at
+# any moment leaves either the previous checkpoint or the new one, never a partial file.
+
+CHECKPOINT_PATH = "models/checkpoints/trainer_state.pt"
+MODEL_PATH = "models/monopoly_ai_trading.pth"
+
+def _atomic_save(obj, path):
+    atomic_write(path, lambda tmp_path: torch.save(obj, tmp_path), fsync=True)
+
+def capture(agent, episode, engine=None, include_replay=False) -> dict:
+    """Snapshot of the training state after `episode` (safe to hand to another thread)."""
+    state = {
+        "episode": episode,
+        "epsilon": agent.epsilon,
+        "model": {k: v.detach().cpu().clone() for k, v in agent.model.state_dict().items()},
+        "optimizer": copy.deepcopy(agent.optimizer.state_dict()),
+        "rng": {
+            "python": random.getstate(),
+            "numpy": np.random.get_state(),
+            "torch": torch.get_rng_state(),
+            "cuda": torch.cuda.get_rng_state_all() if torch.cuda.is_available() else None
+        },
+        "engine": engine.snapshot() if engine is not None else None,
+        "replay": agent.memory.state_dict() if include_replay else None
+    }
+    return state
+
+def restore(agent, state, engine=None) -> int:
+    """Loads a captured state into agent (and engine). Returns the episode it was taken after."""
+    agent.model.load_state_dict(state["model"])
+    agent.optimizer.load_state_dict(state["optimizer"])
+    agent.epsilon = state["epsilon"]
+
+    rng = state["rng"]
+    random.setstate(rng["python"])
+    np.random.set_state(rng["numpy"])
+    torch.set_rng_state(rng["torch"])
+    if rng["cuda"] is not None and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(rng["cuda"])
+
+    if engine is not None and state["engine"] is not None:
+        engine.restore(state["engine"])
+    if state["replay"] is not None:
+        agent.memory.load_state_dict(state["replay"])
+    return state["episode"]
+
+def load(path=CHECKPOINT_PATH):
+    """The checkpoint at path, or None if there is none."""
+    if not os.path.exists(path):
+        return None
+    # Our own files: they hold NumPy/RNG state, which the weights-only loader rejects
+    return torch.load(path, map_location="cpu", weights_only=False)
+
+class Checkpointer:
+    """
+    Writes checkpoints from a background thread. save() only queues the snapshot; if the
+    previous one is still being written it waits for that write (at most one is pending),
+    so checkpoints are never dropped or reordered. Each save also refreshes the plain
+    model state_dict at model_path for the dashboard/API.
+    Errors from the writer thread are raised on the next save() or close().
+    """
+
+    def __init__(self, path=CHECKPOINT_PATH, model_path=MODEL_PATH):
+        self.path = path
+        self.model_path = model_path
+        self.pending = queue.Queue(maxsize=1)
+        self.error = None
+        self.thread = threading.Thread(target=self._writer_loop, name="checkpoint-writer", daemon=True)
+        self.thread.start()
+
+    def save(self, state):
+        self._raise_writer_error()
+        self.pending.put(state)
+
+    def _writer_loop(self):
+        while True:
+            state = self.pending.get()
+            if state is None:
+                return
+            try:
+                _atomic_save(state, self.path)
+                if self.model_path:
+                    _atomic_save(state["model"], self.model_path)
+            except Exception as e:
+                self.error = e
+
+    def _raise_writer_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise RuntimeError(f"Checkpoint write failed: {error}") from error
+
+    def close(self):
+        """Waits for queued checkpoints to be on disk."""
+        self.pending.put(None)
+        self.thread.join()
+        self._raise_writer_error()
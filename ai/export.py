@@ -0,0 +1,146 @@
+import json
+import os
+import numpy as np
+import torch
+import torch.nn as nn
+from ai.rl_agent import MonopolyNet
+from core.io import atomic_write
+
+# --- CPU INFERENCE EXPORT ---
+# Turns a float checkpoint into frozen TorchScript modules for the API nodes:
+#   <stem>.ts.pt    float32, frozen TorchScript
+#   <stem>.int8.pt  dynamic int8 quantization of the nn.Linear layers, frozen
+# Each file carries meta.json (input size, variant) so MonopolyExpert can load it directly.
+# A variant whose action agreement with the float model on the recorded states is below
+# MIN_AGREEMENT is not written (an existing file is left as it was).
+# Run: python -m ai.export [--min-agreement 0.95]
+
+MODEL_PATH = "models/monopoly_ai_trading.pth"
+STATES_PATH = "data/cache/parity_states.npy"
+VARIANTS = {"torchscript": ".ts.pt", "int8": ".int8.pt"}
+MIN_AGREEMENT = 0.95  # Share of recorded states where the export must pick the float model's action
+
+def load_float_model(model_path=MODEL_PATH):
+    """The eager float model, sized from the checkpoint."""
+    state_dict = torch.load(model_path, map_location="cpu")
+    model = MonopolyNet(state_dict['fc1.weight'].shape[1], state_dict['fc4.weight'].shape[0])
+    model.load_state_dict(state_dict)
+    return model.eval()
+
+def freeze(model):
+    """Scripts and freezes a module (weights become constants, no autograd state)."""
+    return torch.jit.freeze(torch.jit.script(model.eval()))
+
+def quantize(model):
+    """
+    Dynamic int8 quantization: Linear weights stored as int8, activations quantized per call.
+    Weights are scaled per output channel; per-tensor scales flip far more decisions on
+    this network, whose top Q-values are often only a fraction of a point apart.
+    """
+    qconfig = torch.ao.quantization.per_channel_dynamic_qconfig
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear: qconfig}, dtype=torch.qint8)
+
+def load_scripted(path):
+    """Loads an exported module. Returns (module, meta). Always on CPU."""
+    extra = {"meta.json": ""}
+    module = torch.jit.load(path, map_location="cpu", _extra_files=extra)
+    return module.eval(), json.loads(extra["meta.json"] or "{}")
+
+def record_states(num_games=20, seed=0, max_turns=300):
+    """Plays seeded games and records the encoded state before every turn ([N, F] float32)."""
+    from core.engine import MonopolyEngine
+    from ai.state_encoder import StateEncoder
+
+    encoder = StateEncoder()
+    engine = MonopolyEngine(seed=seed, max_turns=max_turns)
+    states = []
+    for game_id in range(num_games):
+        engine.reset(game_id=game_id)
+        while not engine.game_over:
+            player = engine.players[engine.current_player_idx]
+            states.append(encoder.encode(player, engine.players, engine.board.spaces))
+            engine.run_turn()
+    return np.stack(states)
+
+def load_states(path=STATES_PATH):
+    """The recorded parity set, recorded and saved on first use."""
+    if os.path.exists(path):
+        return np.load(path)
+    states = record_states()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.save(path, states)
+    return states
+
+def parity(reference, candidate, states, batch_size=4096):
+    """Action agreement and Q-value error of `candidate` against `reference` on recorded states."""
+    agree = 0
+    max_error = 0.0
+    total_error = 0.0
+    values = 0
+    with torch.no_grad():
+        for start in range(0, len(states), batch_size):
+            x = torch.from_numpy(states[start:start + batch_size])
+            q_ref = reference(x)
+            q_new = candidate(x)
+            error = (q_new - q_ref).abs()
+            agree += int((q_ref.argmax(dim=1) == q_new.argmax(dim=1)).sum())
+            max_error = max(max_error, float(error.max()))
+            total_error += float(error.sum())
+            values += error.numel()
+    return {
+        "states": len(states),
+        "action_agreement": agree / len(states),
+        "max_q_error": max_error,
+        "mean_q_error": total_error / values
+    }
+
+def export(model_path=MODEL_PATH, states_path=STATES_PATH, min_agreement=MIN_AGREEMENT):
+    """
+    Writes both variants next to the checkpoint and returns {variant: (path, parity report)}.
+    A variant below min_agreement is discarded: its report has "passed": False.
+    """
+    model = load_float_model(model_path)
+    states = load_states(states_path)
+    stem = os.path.splitext(model_path)[0]
+
+    reports = {}
+    for variant, suffix in VARIANTS.items():
+        module = freeze(quantize(model) if variant == "int8" else model)
+        meta = {"input_size": model.fc1.in_features, "variant": variant,
+                "source": os.path.basename(model_path)}
+        path = stem + suffix
+        report = {}
+
+        def write(tmp_path):
+            torch.jit.save(module, tmp_path, _extra_files={"meta.json": json.dumps(meta)})
+            # Check the file as it will be loaded, before it replaces anything
+            report.update(parity(model, load_scripted(tmp_path)[0], states))
+            return report["action_agreement"] >= min_agreement
+
+        report["passed"] = atomic_write(path, write)
+        reports[variant] = (path, report)
+    return reports
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Export the trading model for CPU inference.")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--min-agreement", type=float, default=MIN_AGREEMENT,
+                        help="minimum action agreement with the float model (0-1)")
+    args = parser.parse_args()
+
+    rejected = []
+    for variant, (path, report) in export(args.model, min_agreement=args.min_agreement).items():
+        if report["passed"]:
+            print(f"--- {variant}: {path} ({os.path.getsize(path) / 1024:.0f} KB) ---")
+        else:
+            print(f"--- {variant}: NOT WRITTEN ---")
+            rejected.append(variant)
+        print(f"Action agreement: {report['action_agreement']:.2%} on {report['states']} states")
+        print(f"Q-value error:    max {report['max_q_error']:.4f} | mean {report['mean_q_error']:.4f}")
+    if rejected:
+        print(f"\n❌ {', '.join(rejected)} below the {args.min_agreement:.0%} action agreement threshold; "
+              f"{'it was' if len(rejected) == 1 else 'they were'} not exported.")
+        sys.exit(1)
@@ -1,59 +1,244 @@
-import torch
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 import numpy as np
 import os
-from ai.rl_agent import MonopolyNet
-from core.board import Board
+
+# torch is imported only by the backends that need it, so a service running the
+# NumPy backend starts without it.
+
+# Output index -> recommendation
+ACTIONS = ["PASS", "BUY", "TRADE"]
+Q_NAMES = ["pass", "buy", "trade"]
+
+class PredictionCache:
+    """
+    Bounded LRU cache of predictions with a time-to-live.
+    Keys are hashes of the state vector quantized to `precision`, so states that differ
+    only by float noise share an entry. Safe to use from several threads at once.
+    Cached result dicts are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_size=10000, ttl=300.0, precision=1e-4):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.precision = precision
+        self.entries = OrderedDict()  # key -> (expires_at, result)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def keys(self, batch: np.ndarray) -> list:
+        """One key per row of a [N, F] batch (quantized in one vectorized step)."""
+        quantized = np.round(batch / self.precision).astype(np.int64)
+        return [hashlib.blake2b(row.tobytes(), digest_size=16).digest() for row in quantized]
+
+    def get_many(self, keys: list) -> list:
+        """Cached result (or None) per key, refreshing the LRU order of hits."""
+        now = time.monotonic()
+        found = []
+        with self.lock:
+            for key in keys:
+                entry = self.entries.get(key)
+                if entry is not None and entry[0] <= now:
+                    del self.entries[key]
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    found.append(None)
+                else:
+                    self.hits += 1
+                    self.entries.move_to_end(key)
+                    found.append(entry[1])
+        return found
+
+    def put_many(self, keys: list, results: list):
+        expires_at = time.monotonic() + self.ttl
+        with self.lock:
+            for key, result in zip(keys, results):
+                self.entries[key] = (expires_at, result)
+                self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drops every entry (e.g. after the model changed). Counters are kept."""
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries), "max_size": self.max_size,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
 
 class MonopolyExpert:
-    def __init__(self, model_path="models/monopoly_ai_trading.pth"):
+    """
+    Serves recommendations from one model. The backend follows the file type:
+        .npz  NumPy forward pass (ai.numpy_net), torch is never imported
+        .pt   exported TorchScript, float or int8 (ai.export)
+        .pth  PyTorch checkpoint
+    """
+
+    def __init__(self, model_path="models/monopoly_ai_trading.pth", cache=None, strict=False):
+        self.cache = cache  # Optional PredictionCache in front of the model
+        self.strict = strict  # Raise on a missing/bad checkpoint instead of using random weights
+        self.load(model_path)
+
+    def load(self, model_path):
+        """(Re)loads the model. Cached predictions belong to the old model and are dropped."""
+        self.model_path = model_path
+        if model_path.endswith(".npz"):
+            self._load_numpy(model_path)
+        elif model_path.endswith(".pt"):
+            self._load_scripted(model_path)
+        else:
+            self._load_checkpoint(model_path)
+
+        if self.cache is not None:
+            self.cache.clear()
+
+    def _load_numpy(self, model_path):
+        from ai.numpy_net import NumpyNet
+
+        self.model = NumpyNet(model_path)
+        self.input_size = self.model.input_size
+        self.backend = "numpy"
+        self.variant = "float"
+        self.device = None
+        print(f"Loaded Trading Expert (numpy) from {model_path}")
+
+    def _load_checkpoint(self, model_path):
+        import torch
+        from ai.rl_agent import MonopolyNet
+
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        
-        # 1. Recreate the Model Architecture
-        # Input: 205 features
+        self.backend = "torch"
+        self.variant = "float"
+
+        # 1. Load the Weights (map_location ensures it loads even if moved from GPU to CPU)
+        state_dict = None
+        if self.strict:
+            state_dict = torch.load(model_path, map_location=self.device)
+        elif os.path.exists(model_path):
+            try:
+                state_dict = torch.load(model_path, map_location=self.device)
+            except Exception as e:
+                print(f"ERROR loading model: {e}")
+        else:
+            print(f"WARNING: Model not found at {model_path}. Using random weights.")
+
+        # 2. Recreate the Model Architecture
+        # Input: sized from the checkpoint (176 features from the current StateEncoder)
         # Output: 3 actions (Pass, Buy, Trade)
-        self.input_size = 205 
-        self.model = MonopolyNet(self.input_size, 3).to(self.device)
-        
-        # 2. Load the Weights
-        if os.path.exists(model_path):
+        self.input_size = state_dict['fc1.weight'].shape[1] if state_dict and 'fc1.weight' in state_dict else 176
+        model = MonopolyNet(self.input_size, 3).to(self.device)
+
+        if state_dict is not None:
             try:
-                # Load weights (map_location ensures it loads even if moved from GPU to CPU)
-                self.model.load_state_dict(torch.load(model_path, map_location=self.device))
-                self.model.eval()
+                model.load_state_dict(state_dict)
                 print(f"Loaded Trading Expert from {model_path}")
             except Exception as e:
+                if self.strict:
+                    raise
                 print(f"ERROR loading model: {e}")
                 print("Using random weights (Untrained)")
-        else:
-            print(f"WARNING: Model not found at {model_path}. Using random weights.")
+        model.eval()
+        self.model = model
 
-    def predict(self, state_vector: list) -> dict:
+    def _load_scripted(self, model_path):
+        import torch
+        from ai.export import load_scripted
+
+        # Exported modules are CPU-only (quantized kernels have no GPU path)
+        model, meta = load_scripted(model_path)
+        self.device = torch.device("cpu")
+        self.backend = "torch"
+        self.input_size = meta["input_size"]
+        self.model = model
+        self.variant = meta.get("variant", "torchscript")
+        print(f"Loaded Trading Expert ({self.variant}) from {model_path}")
+
+    def as_batch(self, states) -> np.ndarray:
         """
-        Takes a raw list of 205 floats and returns the recommendation.
+        Validates one state vector or a list/matrix of them in a single pass.
+        Returns a [N, input_size] float32 array or raises ValueError.
         """
-        state_tensor = torch.FloatTensor(state_vector).unsqueeze(0).to(self.device)
-        
+        try:
+            batch = np.asarray(states, dtype=np.float32)
+        except (TypeError, ValueError):
+            raise ValueError("States must be numeric vectors of equal length.")
+        if batch.ndim == 1:
+            batch = batch[None]
+        if batch.ndim != 2 or batch.shape[0] == 0 or batch.shape[1] != self.input_size:
+            raise ValueError(f"Expected state vectors of {self.input_size} floats, got shape {list(batch.shape)}.")
+        if not np.isfinite(batch).all():
+            raise ValueError("State vectors must not contain NaN or infinity.")
+        return batch
+
+    def cached(self, state) -> dict:
+        """Cached prediction for one validated state, or None (always None without a cache)."""
+        if self.cache is None:
+            return None
+        return self.cache.get_many(self.cache.keys(state))[0]
+
+    def q_values(self, batch: np.ndarray) -> np.ndarray:
+        """Raw Q-values [N, actions] for a validated [N, F] float32 batch (any backend)."""
+        if self.backend == "numpy":
+            return self.model(batch)
+        import torch
         with torch.no_grad():
-            q_values = self.model(state_tensor)
-            
-        # Extract values
-        q_vals = q_values[0].tolist() # Convert tensor to list [v0, v1, v2]
-        
-        # Map indices to actions
-        actions = ["PASS", "BUY", "TRADE"]
-        best_action_idx = int(torch.argmax(q_values).item())
-        recommendation = actions[best_action_idx]
-        
-        # Calculate Confidence (Gap between best and second best)
-        sorted_q = sorted(q_vals, reverse=True)
-        confidence = sorted_q[0] - sorted_q[1]
-        
-        return {
-            "recommendation": recommendation,
-            "confidence_score": confidence,
-            "q_values": {
-                "pass": q_vals[0],
-                "buy": q_vals[1],
-                "trade": q_vals[2]
+            return self.model(torch.from_numpy(batch).to(self.device)).cpu().numpy()
+
+    def _forward(self, batch: np.ndarray) -> list:
+        """One forward pass over a validated [N, F] batch."""
+        q_values = self.q_values(batch)
+
+        # Confidence: gap between the best and second best Q-value
+        best = q_values.argmax(axis=1)
+        top2 = np.sort(q_values, axis=1)[:, -2:]
+        confidence = top2[:, 1] - top2[:, 0]
+
+        # Older checkpoints have two outputs (Pass, Buy)
+        names = Q_NAMES[:q_values.shape[1]]
+        return [
+            {
+                "recommendation": ACTIONS[b],
+                "confidence_score": c,
+                "q_values": dict(zip(names, q))
             }
-        }
\ No newline at end of file
+            for b, c, q in zip(best.tolist(), confidence.tolist(), q_values.tolist())
+        ]
+
+    def predict_batch(self, states, lookup=True) -> list:
+        """
+        Takes N state vectors (list of lists or an [N, F] array) and returns one
+        recommendation dict per state. Cache hits are served directly and all misses
+        share a single forward pass. lookup=False skips the lookup (the caller already
+        checked) but still stores the new results.
+        """
+        batch = self.as_batch(states)
+        if self.cache is None:
+            return self._forward(batch)
+
+        keys = self.cache.keys(batch)
+        results = self.cache.get_many(keys) if lookup else [None] * len(keys)
+        missing = [i for i, r in enumerate(results) if r is None]
+        if missing:
+            fresh = self._forward(batch[missing])
+            for i, result in zip(missing, fresh):
+                results[i] = result
+            self.cache.put_many([keys[i] for i in missing], fresh)
+        return results
+
+    def predict(self, state_vector: list) -> dict:
+        """
+        Takes a raw list of input_size floats and returns the recommendation.
+        """
+        return self.predict_batch([state_vector])[0]
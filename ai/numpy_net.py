@@ -0,0 +1,94 @@
+import os
+import zipfile
+import numpy as np
+from core.io import atomic_write
+
+# --- TORCH-FREE INFERENCE ---
+# A trained policy is a stack of Linear layers with ReLU between them. convert() turns a
+# .pth state dict into an uncompressed .npz (one [in, out] matrix and bias per layer);
+# NumpyNet memory-maps those arrays straight out of the archive and runs the forward pass
+# with NumPy, so serving never imports torch. Only convert() needs torch.
+# Run: python -m ai.numpy_net   (converts every checkpoint in models/)
+
+MODELS_DIR = "models"
+
+def npz_path_for(pth_path):
+    return os.path.splitext(pth_path)[0] + ".npz"
+
+def convert(pth_path, npz_path=None):
+    """
+    Writes the Linear layers of a checkpoint, in order, as w0, b0, w1, b1, ...
+    Works for any Linear+ReLU stack (fc1..fc4 as well as the older network.0..6 layout).
+    """
+    import torch
+
+    npz_path = npz_path or npz_path_for(pth_path)
+    state_dict = torch.load(pth_path, map_location="cpu")
+    arrays = {}
+    layer = 0
+    for name, tensor in state_dict.items():
+        if name.endswith(".weight") and tensor.dim() == 2:
+            bias = state_dict[name[:-len("weight")] + "bias"]
+            # Stored transposed and contiguous so the forward pass is x @ w + b
+            arrays[f"w{layer}"] = np.ascontiguousarray(tensor.numpy().T, dtype=np.float32)
+            arrays[f"b{layer}"] = bias.numpy().astype(np.float32)
+            layer += 1
+    if not layer:
+        raise ValueError(f"No Linear layers found in {pth_path}")
+
+    def write(tmp_path):
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)  # Uncompressed: members stay memory-mappable
+    atomic_write(npz_path, write)
+    return npz_path
+
+def _mmap_npz(path):
+    """
+    Memory-maps every array of an uncompressed .npz without copying it.
+    (np.load only memory-maps plain .npy files, so the member offsets are found by hand.)
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path} is compressed; re-run convert()")
+            # Local file header: 30 fixed bytes, then the name and extra field
+            f.seek(info.header_offset + 26)
+            name_len, extra_len = np.frombuffer(f.read(4), dtype="<u2")
+            f.seek(info.header_offset + 30 + int(name_len) + int(extra_len))
+
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            arrays[info.filename[:-len(".npy")]] = np.memmap(
+                path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                order='F' if fortran_order else 'C'
+            )
+    return arrays
+
+class NumpyNet:
+    """Forward pass of a converted Linear+ReLU stack. Call with a [N, F] float32 batch."""
+
+    def __init__(self, npz_path):
+        arrays = _mmap_npz(npz_path)
+        self.layers = [(arrays[f"w{i}"], arrays[f"b{i}"]) for i in range(len(arrays) // 2)]
+        self.input_size = self.layers[0][0].shape[0]
+        self.output_size = self.layers[-1][0].shape[1]
+
+    def __call__(self, x):
+        last = len(self.layers) - 1
+        for i, (w, b) in enumerate(self.layers):
+            x = x @ w
+            x += b
+            if i < last:
+                np.maximum(x, 0.0, out=x)
+        return x
+
+if __name__ == "__main__":
+    for name in sorted(os.listdir(MODELS_DIR)):
+        if name.endswith(".pth"):
+            path = convert(os.path.join(MODELS_DIR, name))
+            net = NumpyNet(path)
+            print(f"{name} -> {path} ({net.input_size} -> {net.output_size}, {len(net.layers)} layers)")
@@ -0,0 +1,150 @@
+import os
+import threading
+from collections import OrderedDict
+from ai.inference import MonopolyExpert
+
+# --- MODEL REGISTRY ---
+# One place for the API, dashboard and runner to get models by name.
+# Checkpoints in models/ are discovered by file name, loaded on first use, kept in an
+# LRU-bounded resident set, and reloaded when their file changes on disk.
+#
+# Names: monopoly_ai_500.pth -> "monopoly_ai_500", monopoly_ai_trading.int8.pt ->
+# "monopoly_ai_trading.int8". A .pth is the source of truth for its name; with the numpy
+# backend it is served through its converted .npz (re-converted when the .pth is newer).
+
+MODEL_SUFFIXES = (".pth", ".npz", ".pt")
+
+def _signature(path):
+    """Changes whenever the file is replaced or rewritten."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+class ModelRegistry:
+    def __init__(self, models_dir="models", default="monopoly_ai_trading", max_resident=4,
+                 backend="numpy", cache_factory=None):
+        self.models_dir = models_dir
+        self.default = default
+        self.max_resident = max_resident
+        self.backend = backend              # "numpy" or "torch" for .pth checkpoints
+        self.cache_factory = cache_factory  # Optional: returns a PredictionCache per model
+        self.sources = {}                   # name -> source file
+        self.resident = OrderedDict()       # name -> (signature, expert), LRU order
+        self.failed = {}                    # name -> signature that failed to load
+        self.lock = threading.Lock()
+        self.load_locks = {}
+        self.discover()
+
+    def discover(self) -> dict:
+        """Rescans the models directory. Returns {name: path}."""
+        sources = {}
+        for filename in sorted(os.listdir(self.models_dir)) if os.path.isdir(self.models_dir) else []:
+            stem, ext = os.path.splitext(filename)
+            if ext not in MODEL_SUFFIXES:
+                continue
+            # A .pth wins over a .npz of the same name (the .npz is derived from it)
+            if ext == ".pth" or stem not in sources:
+                sources[stem] = os.path.join(self.models_dir, filename)
+        with self.lock:
+            self.sources = sources
+        return dict(sources)
+
+    def names(self) -> list:
+        return sorted(self.discover())
+
+    def resolve(self, name=None) -> str:
+        """The registered name for `name` (None = default). Raises KeyError if unknown."""
+        name = name or self.default
+        if name not in self.sources:
+            self.discover()
+            if name not in self.sources:
+                raise KeyError(f"Unknown model '{name}'")
+        return name
+
+    def peek(self, name=None):
+        """
+        The resident expert for `name` if its file is unchanged, else None. Never loads,
+        so it is safe on an event loop; fall back to get() (in a thread) on None.
+        """
+        name = self.resolve(name)
+        signature = _signature(self.sources[name])
+        with self.lock:
+            entry = self.resident.get(name)
+            if entry is not None and signature is not None and (
+                    entry[0] == signature or self.failed.get(name) == signature):
+                self.resident.move_to_end(name)
+                return entry[1]
+        return None
+
+    def get(self, name=None) -> MonopolyExpert:
+        """
+        The expert for `name`, loading it on first use or after its file changed.
+        A reload is built completely before it replaces the resident copy, so callers
+        holding the old expert keep using it. If a reload fails the old copy stays.
+        """
+        name = self.resolve(name)
+        path = self.sources[name]
+        signature = _signature(path)
+        if signature is None:
+            with self.lock:
+                self.resident.pop(name, None)
+                self.sources.pop(name, None)
+            raise KeyError(f"Model file for '{name}' is gone")
+
+        with self.lock:
+            entry = self.resident.get(name)
+            if entry is not None and (entry[0] == signature or self.failed.get(name) == signature):
+                self.resident.move_to_end(name)
+                return entry[1]
+            load_lock = self.load_locks.setdefault(name, threading.Lock())
+
+        with load_lock:
+            # Another thread may have loaded it while we waited
+            with self.lock:
+                entry = self.resident.get(name)
+                if entry is not None and entry[0] == signature:
+                    return entry[1]
+            try:
+                expert = self._load(path)
+            except Exception as e:
+                with self.lock:
+                    self.failed[name] = signature
+                if entry is not None:
+                    print(f"WARNING: Reload of '{name}' failed ({e}); keeping the loaded version.")
+                    return entry[1]
+                raise
+
+            with self.lock:
+                self.failed.pop(name, None)
+                self.resident[name] = (signature, expert)
+                self.resident.move_to_end(name)
+                while len(self.resident) > self.max_resident:
+                    self.resident.popitem(last=False)
+        return expert
+
+    def _load(self, path):
+        cache = self.cache_factory() if self.cache_factory else None
+        if path.endswith(".pth") and self.backend == "numpy":
+            from ai.numpy_net import convert, npz_path_for
+
+            npz_path = npz_path_for(path)
+            if not os.path.exists(npz_path) or os.path.getmtime(npz_path) < os.path.getmtime(path):
+                convert(path, npz_path)  # Needs torch once; later starts load the .npz only
+            path = npz_path
+        return MonopolyExpert(path, cache=cache, strict=True)
+
+    def info(self) -> list:
+        """Every discovered model, with whether it is resident and its input size."""
+        sources = self.discover()
+        with self.lock:
+            resident = dict(self.resident)
+        return [
+            {
+                "name": name, "path": path, "default": name == self.default,
+                "resident": name in resident,
+                "input_size": resident[name][1].input_size if name in resident else None
+            }
+            for name, path in sorted(sources.items())
+        ]
@@ -0,0 +1,286 @@
+import numpy as np
+
+# --- REPLAY MEMORY ---
+# Transitions live in preallocated arrays (one row per transition) written as a ring:
+# once full, the oldest rows are overwritten. A minibatch is one vectorized index draw
+# and one fancy-index gather per array, whatever the capacity.
+# Prioritized mode samples in proportion to |TD error|^alpha through a sum-tree
+# (Schaul et al., "Prioritized Experience Replay").
+
+class SumTree:
+    """
+    Binary tree over `capacity` leaves where each node holds the sum of its children.
+    Updates and prefix-sum lookups are O(log n) and vectorized over many leaves at once.
+    """
+
+    def __init__(self, capacity):
+        self.leaves = 1
+        while self.leaves < capacity:
+            self.leaves *= 2
+        self.tree = np.zeros(2 * self.leaves, dtype=np.float64)  # tree[1] is the root
+
+    @property
+    def total(self) -> float:
+        return float(self.tree[1])
+
+    def update(self, indices: np.ndarray, priorities: np.ndarray):
+        nodes = np.asarray(indices, dtype=np.int64) + self.leaves
+        self.tree[nodes] = priorities
+        # Recompute each changed parent once per level, up to the root
+        nodes = np.unique(nodes // 2)
+        while nodes[0] >= 1:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            if nodes[0] == 1:
+                break
+            nodes = np.unique(nodes // 2)
+
+    def find(self, values: np.ndarray) -> np.ndarray:
+        """Leaf index for each prefix-sum value in [0, total)."""
+        nodes = np.ones(len(values), dtype=np.int64)
+        values = np.array(values, dtype=np.float64)
+        while nodes[0] < self.leaves:
+            left = self.tree[2 * nodes]
+            go_right = values >= left
+            values -= np.where(go_right, left, 0.0)
+            nodes = 2 * nodes + go_right
+        return nodes - self.leaves
+
+class ReplayBuffer:
+    """
+    Fixed-capacity transition memory backed by contiguous NumPy arrays.
+    prioritized=True draws transitions by priority and returns importance weights;
+    call update_priorities() with the new TD errors after each learning step.
+    """
+
+    def __init__(self, capacity, state_size, prioritized=False, alpha=0.6, beta=0.4, eps=1e-3, seed=None):
+        self.capacity = capacity
+        self.prioritized = prioritized
+        self.alpha = alpha  # 0 = uniform, 1 = fully proportional to TD error
+        self.beta = beta    # Importance-sampling correction (1 = full correction)
+        self.eps = eps      # Keeps every transition drawable
+        self.rng = np.random.default_rng(seed)
+
+        # np.zeros pages memory in lazily, so a large capacity costs nothing until it fills
+        self.states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.float32)
+        self.pos = 0   # Next row to write
+        self.size = 0
+
+        self.tree = SumTree(capacity) if prioritized else None
+        self.max_priority = 1.0  # New transitions get the highest priority seen so far
+
+    def __len__(self):
+        return self.size
+
+    def push(self, state, action, reward, next_state, done):
+        self.push_batch([state], [action], [reward], [next_state], [done])
+
+    def push_batch(self, states, actions, rewards, next_states, dones):
+        """Stores N transitions with one write per array (wrapping around when full)."""
+        n = len(actions)
+        if n > self.capacity:
+            # Only the newest `capacity` rows would survive anyway
+            states, actions, rewards = states[-self.capacity:], actions[-self.capacity:], rewards[-self.capacity:]
+            next_states, dones = next_states[-self.capacity:], dones[-self.capacity:]
+            n = self.capacity
+        rows = (self.pos + np.arange(n)) % self.capacity
+        self.states[rows] = states
+        self.actions[rows] = actions
+        self.rewards[rows] = rewards
+        self.next_states[rows] = next_states
+        self.dones[rows] = dones
+        if self.tree is not None:
+            self.tree.update(rows, np.full(n, self.max_priority ** self.alpha))
+        self.pos = (self.pos + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def sample(self, batch_size):
+        """
+        Draws batch_size transitions (with replacement).
+        Returns (states, actions, rewards, next_states, dones, indices, weights);
+        weights are all 1 in uniform mode.
+        """
+        if self.tree is None:
+            indices = self.rng.integers(0, self.size, size=batch_size)
+            weights = np.ones(batch_size, dtype=np.float32)
+        else:
+            # One draw per equal slice of the total priority (stratified)
+            total = self.tree.total
+            bounds = (np.arange(batch_size) + self.rng.random(batch_size)) * (total / batch_size)
+            indices = np.minimum(self.tree.find(bounds), self.size - 1)
+            probs = self.tree.tree[indices + self.tree.leaves] / total
+            weights = (self.size * probs) ** -self.beta
+            weights = (weights / weights.max()).astype(np.float32)
+
+        return (
+            self.states[indices], self.actions[indices], self.rewards[indices],
+            self.next_states[indices], self.dones[indices], indices, weights
+        )
+
+    def state_dict(self) -> dict:
+        """
+        Copy of the stored transitions, oldest first, with priorities and RNG (for checkpoints).
+        The same layout as SharedReplayBuffer.state_dict, so either can load the other's.
+        """
+        n = self.size
+        rows = (self.pos - n + np.arange(n)) % self.capacity
+        return {
+            "capacity": self.capacity, "pos": self.pos,
+            "states": self.states[rows], "actions": self.actions[rows],
+            "rewards": self.rewards[rows], "next_states": self.next_states[rows],
+            "dones": self.dones[rows],
+            "priorities": self.tree.tree[rows + self.tree.leaves] if self.tree is not None else None,
+            "max_priority": self.max_priority,
+            "rng": self.rng.bit_generator.state
+        }
+
+    def load_state_dict(self, state):
+        """
+        Restores a state_dict. With the same capacity the layout is restored exactly;
+        otherwise the newest rows that fit are kept.
+        """
+        n = min(len(state["actions"]), self.capacity)
+        pos = state["pos"] if state.get("capacity") == self.capacity else n % self.capacity
+        rows = (pos - n + np.arange(n)) % self.capacity
+        self.states[rows] = state["states"][-n:]
+        self.actions[rows] = state["actions"][-n:]
+        self.rewards[rows] = state["rewards"][-n:]
+        self.next_states[rows] = state["next_states"][-n:]
+        self.dones[rows] = state["dones"][-n:]
+        self.pos, self.size = pos, n
+        self.max_priority = state["max_priority"]
+        if self.tree is not None:
+            self.tree.tree[:] = 0.0
+            priorities = state["priorities"]
+            if n:
+                self.tree.update(rows, priorities[-n:] if priorities is not None
+                                 else np.full(n, self.max_priority ** self.alpha))
+        if state.get("rng") is not None:
+            self.rng.bit_generator.state = state["rng"]
+
+    def update_priorities(self, indices, td_errors):
+        """New priorities from the absolute TD errors of a sampled batch."""
+        if self.tree is None:
+            return
+        priorities = np.abs(td_errors) + self.eps
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(indices, priorities ** self.alpha)
+
+class SharedReplayBuffer:
+    """
+    Uniform replay memory in shared memory, written by several processes and sampled by one.
+    The capacity is split into one ring segment per writer, so writers never contend:
+    each process calls writer(i) once and then push_batch() into its own segment.
+    A row is counted (and so sampleable) only after it is fully written; a reader may still
+    see a row that its writer is overwriting after wrap-around, which at worst mixes two
+    transitions in one sample.
+    Pass it to the processes at creation (multiprocessing Process args).
+    """
+
+    prioritized = False
+
+    def __init__(self, capacity, state_size, writers, ctx=None, seed=None):
+        import multiprocessing
+
+        ctx = ctx or multiprocessing.get_context()
+        self.segment = max(1, capacity // writers)
+        self.writers = writers
+        self.state_size = state_size
+        rows = self.segment * writers
+        self.raw = ctx.RawArray('b', rows * (2 * state_size + 3) * 4)  # float32/int32 columns
+        self.counts = ctx.RawArray('q', writers)  # Transitions ever written, per writer
+        self.slot = None
+        self.seed = seed
+        self._views()
+
+    def _views(self):
+        rows = self.segment * self.writers
+        block = np.frombuffer(self.raw, dtype=np.float32)
+        width = self.state_size
+        self.states = block[:rows * width].reshape(rows, width)
+        self.next_states = block[rows * width:2 * rows * width].reshape(rows, width)
+        tail = 2 * rows * width
+        self.rewards = block[tail:tail + rows]
+        self.dones = block[tail + rows:tail + 2 * rows]
+        self.actions = np.frombuffer(self.raw, dtype=np.int32, count=rows, offset=(tail + 2 * rows) * 4)
+        self.written = np.frombuffer(self.counts, dtype=np.int64)
+        self.rng = np.random.default_rng(self.seed)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ("states", "next_states", "rewards", "dones", "actions", "written", "rng"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._views()
+
+    def writer(self, slot):
+        """Binds this process to its segment."""
+        self.slot = slot
+
+    def push(self, state, action, reward, next_state, done):
+        self.push_batch([state], [action], [reward], [next_state], [done])
+
+    def push_batch(self, states, actions, rewards, next_states, dones):
+        n = min(len(actions), self.segment)
+        count = int(self.written[self.slot])
+        rows = self.slot * self.segment + (count + np.arange(n)) % self.segment
+        self.states[rows] = states[-n:]
+        self.actions[rows] = actions[-n:]
+        self.rewards[rows] = rewards[-n:]
+        self.next_states[rows] = next_states[-n:]
+        self.dones[rows] = dones[-n:]
+        self.written[self.slot] = count + n  # Publish only after the rows are in place
+
+    def total_pushed(self) -> int:
+        return int(self.written.sum())
+
+    def __len__(self):
+        return int(np.minimum(self.written, self.segment).sum())
+
+    def sample(self, batch_size):
+        """Uniform draw over every filled row. Same return layout as ReplayBuffer.sample."""
+        filled = np.minimum(self.written, self.segment)
+        ends = np.cumsum(filled)
+        draws = self.rng.integers(0, ends[-1], size=batch_size)
+        segments = np.searchsorted(ends, draws, side='right')
+        indices = segments * self.segment + draws - (ends - filled)[segments]
+        return (
+            self.states[indices], self.actions[indices].astype(np.int64), self.rewards[indices],
+            self.next_states[indices], self.dones[indices], indices, np.ones(batch_size, dtype=np.float32)
+        )
+
+    def state_dict(self) -> dict:
+        """Every filled row (segment by segment), in the ReplayBuffer.state_dict layout."""
+        filled = np.minimum(self.written, self.segment)
+        rows = np.concatenate([
+            w * self.segment + (self.written[w] - filled[w] + np.arange(filled[w])) % self.segment
+            for w in range(self.writers)
+        ]).astype(np.int64)
+        return {
+            "capacity": None, "pos": 0,
+            "states": self.states[rows], "actions": self.actions[rows].astype(np.int64),
+            "rewards": self.rewards[rows], "next_states": self.next_states[rows],
+            "dones": self.dones[rows], "priorities": None, "max_priority": 1.0, "rng": None
+        }
+
+    def load_state_dict(self, state):
+        """Spreads saved rows (newest that fit) evenly over the writers' segments. Call before writers start."""
+        total = min(len(state["actions"]), self.segment * self.writers)
+        first = len(state["actions"]) - total
+        for w, chunk in enumerate(np.array_split(np.arange(first, first + total), self.writers)):
+            rows = w * self.segment + np.arange(len(chunk))
+            self.states[rows] = state["states"][chunk]
+            self.actions[rows] = state["actions"][chunk]
+            self.rewards[rows] = state["rewards"][chunk]
+            self.next_states[rows] = state["next_states"][chunk]
+            self.dones[rows] = state["dones"][chunk]
+            self.written[w] = len(chunk)
+
+    def update_priorities(self, indices, td_errors):
+        pass  # Uniform only: priorities would need a sum-tree shared by every writer
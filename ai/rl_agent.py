@@ -3,7 +3,7 @@ import torch.nn as nn
 import torch.optim as optim
 import random
 import numpy as np
-from collections import deque
+from ai.replay import ReplayBuffer
 
 class MonopolyNet(nn.Module):
     def __init__(self, input_size, output_size):
@@ -21,12 +21,12 @@ class MonopolyNet(nn.Module):
         return self.fc4(x)
 
 class Agent:
-    def __init__(self, state_size, action_size, device=None):
+    def __init__(self, state_size, action_size, device=None, memory_size=2000, prioritized=False):
         self.state_size = state_size
         self.action_size = action_size
         
         # Hyperparameters
-        self.memory = deque(maxlen=2000)
+        self.memory = ReplayBuffer(memory_size, state_size, prioritized=prioritized)
         self.gamma = 0.95    # discount rate
         self.epsilon = 1.0   # exploration rate
         self.epsilon_min = 0.01
@@ -57,22 +57,41 @@ class Agent:
             
         return torch.argmax(act_values[0]).item()
 
+    def act_batch(self, states):
+        """Epsilon-greedy actions for a [N, state_size] batch, one forward pass for all rows."""
+        n = len(states)
+        explore = np.random.rand(n) <= self.epsilon
+        actions = np.random.randint(self.action_size, size=n)
+        if not explore.all():
+            with torch.no_grad():
+                act_values = self.model(torch.as_tensor(states, dtype=torch.float32, device=self.device))
+            greedy = act_values.argmax(dim=1).cpu().numpy()
+            actions[~explore] = greedy[~explore]
+        return actions
+
+    def remember_batch(self, states, actions, rewards, next_states, dones):
+        """Stores N transitions at once (rows are copied, so reused buffers are safe to pass)."""
+        self.memory.push_batch(states, actions, rewards, next_states, dones)
+
     def train(self, state, action, reward, next_state, done):
         # Store in memory
-        self.memory.append((state, action, reward, next_state, done))
-        
+        self.memory.push(state, action, reward, next_state, done)
+        self.replay()
+
+    def replay(self, batch_size=32):
+        """One gradient step on a random minibatch from memory."""
         if len(self.memory) < 64:
             return
 
-        # Mini-batch training
-        minibatch = random.sample(self.memory, 32)
+        # Mini-batch training (one gather per array, straight into tensors)
+        states, actions, rewards, next_states, dones, indices, weights = self.memory.sample(batch_size)
         
         # Prepare batches on GPU
-        states = torch.FloatTensor(np.array([m[0] for m in minibatch])).to(self.device)
-        actions = torch.LongTensor(np.array([m[1] for m in minibatch])).unsqueeze(1).to(self.device)
-        rewards = torch.FloatTensor(np.array([m[2] for m in minibatch])).to(self.device)
-        next_states = torch.FloatTensor(np.array([m[3] for m in minibatch])).to(self.device)
-        dones = torch.FloatTensor(np.array([m[4] for m in minibatch])).to(self.device)
+        states = torch.from_numpy(states).to(self.device)
+        actions = torch.from_numpy(actions).unsqueeze(1).to(self.device)
+        rewards = torch.from_numpy(rewards).to(self.device)
+        next_states = torch.from_numpy(next_states).to(self.device)
+        dones = torch.from_numpy(dones).to(self.device)
 
         # Predict Q values
         current_q = self.model(states).gather(1, actions).squeeze(1)
@@ -81,8 +100,13 @@ class Agent:
         next_q = self.model(next_states).max(1)[0]
         target_q = rewards + (self.gamma * next_q * (1 - dones))
         
-        # Backprop
-        loss = self.criterion(current_q, target_q.detach())
+        # Backprop (prioritized replay: weighted by importance, priorities from the new TD errors)
+        if self.memory.prioritized:
+            td_error = target_q.detach() - current_q
+            loss = (torch.from_numpy(weights).to(self.device) * td_error.pow(2)).mean()
+            self.memory.update_priorities(indices, td_error.detach().cpu().numpy())
+        else:
+            loss = self.criterion(current_q, target_q.detach())
         self.optimizer.zero_grad()
         loss.backward()
         self.optimizer.step()
@@ -1,106 +1,130 @@
+import weakref
 import numpy as np
-import torch
+from core.engine import SPACE_PRICES
+from core.markov import landing_distribution
+
+# --- STATE LAYOUT (176 floats) ---
+# [0:4]     current player: position, cash, in jail, net worth
+# [4:16]    opponents in seat order, 4 each
+# [16:176]  40 spaces x (ownership, heatmap, mortgaged, houses)
+PLAYER_FEATURES = 4
+BOARD_OFFSET = 16
+STATE_SIZE = BOARD_OFFSET + 40 * 4
+
+# Per-feature scale for the player blocks: position, cash, jail, net worth
+_PLAYER_SCALE = np.array([1 / 40.0, 1 / 5000.0, 1.0, 1 / 10000.0], dtype=np.float32)
+
+class _BoardFeatures:
+    """
+    The board block for one Board, kept up to date from its change events.
+    block[p] is the 40x4 board section as seen by player p, so encoding is a copy.
+    assets[p] is the list price of everything player p owns (the raw net worth part).
+    Holds the board's lists, not the board, so the encoder's cache never keeps it alive.
+    """
+
+    def __init__(self, board, template):
+        self.owner = board.owner
+        self.houses = board.houses
+        self.mortgaged = board.mortgaged
+        self.board_ref = weakref.ref(board)
+        self.template = template
+        self.rebuild()
+        board.listeners.append(self.on_change)
+
+    def rebuild(self):
+        num_players = len(self.board_ref().owned_masks)
+        self.block = np.repeat(self.template[None], num_players, axis=0)
+        self.assets = [0] * num_players
+        self.owned = [None] * 40
+        for space_id in range(40):
+            self.on_change(space_id)
+
+    def on_change(self, space_id):
+        if space_id is None:
+            self.rebuild()
+            return
+
+        # 1. Asset totals (move the price from the old owner to the new one)
+        owner = self.owner[space_id]
+        old_owner = self.owned[space_id]
+        if old_owner != owner:
+            if old_owner is not None:
+                self.assets[old_owner] -= SPACE_PRICES[space_id]
+            if owner is not None:
+                self.assets[owner] += SPACE_PRICES[space_id]
+            self.owned[space_id] = owner
+
+        # 2. The space's row for every point of view (1=Me, -1=Opponent, 0=Bank)
+        rows = self.block[:, space_id]
+        rows[:, 0] = 0.0 if owner is None else -1.0
+        if owner is not None:
+            rows[owner, 0] = 1.0
+        rows[:, 2] = 1.0 if self.mortgaged[space_id] else 0.0
+        rows[:, 3] = self.houses[space_id] / 5.0
 
 class StateEncoder:
     def __init__(self):
         # 40 spaces on the board.
-        # This heatmap represents the statistical probability of landing on a square.
-        # Source: Standard Monopoly Monte Carlo simulations.
+        # This heatmap represents the statistical probability of landing on a square (%).
+        # Source: core.markov solves the landing Markov chain (dice, jail rules and the
+        # movement cards in the decks). The result is cached per ruleset/deck hash.
         # High peaks: Jail exits (Oranges/Reds) and Railroads.
         # Low valleys: Brown, Dark Blue, and the "Green Graveyard".
-        self.heatmap = [
-            2.1,  # 00 GO
-            1.7,  # 01 Old Kent Road (Brown)
-            1.8,  # 02 Community Chest
-            1.7,  # 03 Whitechapel Road (Brown)
-            2.0,  # 04 Income Tax
-            2.9,  # 05 Kings Cross Station (Rail)
-            2.3,  # 06 The Angel Islington (L.Blue)
-            1.0,  # 07 Chance
-            2.3,  # 08 Euston Road (L.Blue)
-            2.4,  # 09 Pentonville Road (L.Blue)
-            5.9,  # 10 JAIL (Just visiting + In Jail)
-            2.7,  # 11 Pall Mall (Pink)
-            2.6,  # 12 Electric Company
-            2.3,  # 13 Whitehall (Pink)
-            2.4,  # 14 Northumberland Avenue (Pink)
-            2.8,  # 15 Marylebone Station (Rail)
-            2.8,  # 16 Bow Street (Orange) - HIGH VALUE
-            1.0,  # 17 Community Chest
-            2.9,  # 18 Marlborough Street (Orange) - HIGH VALUE
-            3.0,  # 19 Vine Street (Orange) - PEAK VALUE
-            2.2,  # 20 Free Parking
-            2.6,  # 21 Strand (Red)
-            1.1,  # 22 Chance
-            2.6,  # 23 Fleet Street (Red)
-            2.7,  # 24 Trafalgar Square (Red)
-            2.9,  # 25 Fenchurch St Station (Rail)
-            2.6,  # 26 Leicester Square (Yellow)
-            2.6,  # 27 Coventry Street (Yellow)
-            2.7,  # 28 Water Works
-            2.6,  # 29 Piccadilly (Yellow)
-            2.4,  # 30 GO TO JAIL (Target, not landable really)
-            2.5,  # 31 Regent Street (Green)
-            2.5,  # 32 Oxford Street (Green)
-            1.0,  # 33 Community Chest
-            2.4,  # 34 Bond Street (Green)
-            2.8,  # 35 Liverpool St Station (Rail)
-            0.9,  # 36 Chance
-            2.1,  # 37 Park Lane (D.Blue) - SURPRISINGLY LOW
-            2.1,  # 38 Super Tax
-            2.6   # 39 Mayfair (D.Blue)
-        ]
+        self.heatmap = landing_distribution() * 100.0
+
+        # Static part of the board block: the heatmap column never changes
+        self.template = np.zeros((40, 4), dtype=np.float32)
+        self.template[:, 1] = self.heatmap / 6.0 # Normalize roughly
+
+        self._boards = weakref.WeakKeyDictionary()
+        self._batch = np.zeros((0, STATE_SIZE), dtype=np.float32)
+
+    def _features(self, board):
+        features = self._boards.get(board)
+        if features is None:
+            features = self._boards[board] = _BoardFeatures(board, self.template)
+        return features
+
+    def _player_rows(self, player, all_players, features):
+        """Raw (unscaled) player features, current player first."""
+        assets = features.assets
+        rows = [player.position, player.cash, player.in_jail, player.cash + assets[player.id]]
+        for p in all_players:
+            if p.id != player.id:
+                rows += (p.position, p.cash, p.in_jail, p.cash + assets[p.id])
+        return rows
 
     def encode(self, player, all_players, board_spaces):
         """
         Converts the game state into a flat vector for the Neural Network.
-        Size: ~205 floats
+        Size: 176 floats (a new array; see encode_batch for the buffered version)
         """
-        state = []
-
-        # --- 1. GLOBAL GAME STATE (Turn count approx, etc) ---
-        # Normalized turn count (0.0 to 1.0, assuming max 100 turns roughly)
-        # We don't have turn count passed here easily, so skipping or relying on cash/props as proxy.
-        
-        # --- 2. CURRENT PLAYER STATUS (4 inputs) ---
-        state.append(player.position / 40.0)  # Norm Position
-        state.append(player.cash / 5000.0)    # Norm Cash (Scale down)
-        state.append(1.0 if player.in_jail else 0.0)
-        state.append(player.get_net_worth_raw() / 10000.0) # Approx Net Worth
-
-        # --- 3. OTHER PLAYERS STATUS (3 opponents * 4 inputs = 12) ---
-        for p in all_players:
-            if p.id != player.id:
-                state.append(p.position / 40.0)
-                state.append(p.cash / 5000.0)
-                state.append(1.0 if p.in_jail else 0.0)
-                state.append(p.get_net_worth_raw() / 10000.0)
-
-        # --- 4. BOARD PROPERTY STATE (40 spaces * X features) ---
-        # For every space, we tell the AI:
-        # - Who owns it? (0=None, 1=Me, -1=Opponent)
-        # - Is it mortgaged?
-        # - Is it a full set? (Monopoly active)
-        # - VALUE HEATMAP (New!)
-        
-        for i, space in enumerate(board_spaces):
-            # Feature 1: Ownership
-            owner_val = 0
-            if space['owner'] is not None:
-                owner_val = 1 if space['owner'] == player.id else -1
-            state.append(owner_val)
-
-            # Feature 2: Heatmap Value (The Strategic Upgrade)
-            # We inject the probability of landing here.
-            # This teaches the AI that Orange > Green.
-            state.append(self.heatmap[i] / 6.0) # Normalize roughly
-
-            # Feature 3: Mortgaged?
-            state.append(1.0 if space.get('mortgaged') else 0.0)
-            
-            # Feature 4: House Count (0-5, normalized)
-            # 5 = Hotel
-            houses = space.get('houses', 0)
-            state.append(houses / 5.0)
-
-        return np.array(state, dtype=np.float32)
\ No newline at end of file
+        features = self._features(board_spaces[0].board)
+        state = np.empty(STATE_SIZE, dtype=np.float32)
+        players = np.array(self._player_rows(player, all_players, features), dtype=np.float32)
+        state[:BOARD_OFFSET] = (players.reshape(-1, PLAYER_FEATURES) * _PLAYER_SCALE).ravel()
+        state[BOARD_OFFSET:] = features.block[player.id].ravel()
+        return state
+
+    def encode_batch(self, games):
+        """
+        Encodes many states at once. `games` is a sequence of (player, all_players, board_spaces),
+        the same arguments as encode(). Returns a [N, 176] view of a reused buffer that is only
+        valid until the next call.
+        """
+        n = len(games)
+        if len(self._batch) < n:
+            self._batch = np.zeros((n, STATE_SIZE), dtype=np.float32)
+        out = self._batch[:n]
+
+        raw = []
+        board = out[:, BOARD_OFFSET:].reshape(n, 40, 4)
+        for i, (player, all_players, board_spaces) in enumerate(games):
+            features = self._features(board_spaces[0].board)
+            raw += self._player_rows(player, all_players, features)
+            board[i] = features.block[player.id]
+
+        # One vectorized scale for every player block in the batch
+        players = np.array(raw, dtype=np.float32).reshape(n, -1, PLAYER_FEATURES) * _PLAYER_SCALE
+        out[:, :BOARD_OFFSET] = players.reshape(n, BOARD_OFFSET)
+        return out
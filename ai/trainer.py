@@ -1,10 +1,14 @@
 import torch
+import torch.multiprocessing as mp
 import numpy as np
 import os
 import random
+import time
 from core.engine import MonopolyEngine
 from ai.state_encoder import StateEncoder
-from ai.rl_agent import Agent
+from ai.rl_agent import Agent, MonopolyNet
+from ai.replay import SharedReplayBuffer
+from ai import checkpoint
 
 # --- HYPERPARAMETERS ---
 EPISODES = 2000
@@ -15,6 +19,17 @@ EPSILON_END = 0.01
 EPSILON_DECAY = 0.998 
 TARGET_UPDATE = 10
 MAX_STEPS_PER_GAME = 200  # Prevents infinite stalemates
+MEMORY_SIZE = 2000  # Replay capacity in transitions (preallocated; millions are fine)
+PRIORITIZED_REPLAY = False  # Sample transitions by TD error instead of uniformly
+CHECKPOINT_EVERY = 100  # Episodes between checkpoints (written in the background)
+CHECKPOINT_REPLAY = True  # Include the replay buffer (large with a big MEMORY_SIZE)
+RESUME = True  # Every mode continues from checkpoint.CHECKPOINT_PATH if it exists and is unfinished
+NUM_ENVS = 1  # Games stepped together by train_vectorized (1 = the original one-game loop, train())
+UPDATES_PER_TRANSITION = 1.0  # Gradient steps (32 samples each) per stored transition; 1 = train()
+NUM_ACTORS = 0  # Actor processes for train_distributed (0 = train in this process; e.g. os.cpu_count() - 1)
+ENVS_PER_ACTOR = 8  # Games stepped together inside each actor
+PUBLISH_EVERY = 50  # Learner updates between weight publications to the actors
+SELF_PLAY = False  # Vectorized/distributed modes: every seat acts on its own view and learns, not just player 0
 
 # --- SMART ENGINE SUBCLASS ---
 class TrainingEngine(MonopolyEngine):
@@ -43,9 +58,8 @@ class TrainingEngine(MonopolyEngine):
                 log['result'] = "pass_choice" if can_afford else "pass_no_money"
                 
         elif space['owner'] != player.id:
-            rent = space['rent']
-            amount = player.pay(rent)
-            self.players[space['owner']].receive(amount)
+            rent = self._rent_due(space.id, space['owner'])
+            amount = self._charge(player, rent, self.players[space['owner']])
             log['result'] = f"paid_rent_{amount}"
         else:
             log['result'] = "already_owned"
@@ -81,16 +95,10 @@ def calculate_reward(player, prev_state, log, trade_success):
     
     return reward
 
-def train():
-    print("--- Initializing Strategy Training (Set Completer) ---")
-    
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    print(f"Device: {device}")
-    
-    engine = TrainingEngine()
-    encoder = StateEncoder()
+def load_agent(device):
     # Corrected input size for the new Encoder
-    agent = Agent(state_size=176, action_size=3, device=device)
+    agent = Agent(state_size=176, action_size=3, device=device,
+                  memory_size=MEMORY_SIZE, prioritized=PRIORITIZED_REPLAY)
     
     # Load previous brain
     if os.path.exists("models/monopoly_ai_trading.pth"):
@@ -100,8 +108,39 @@ def train():
             print("Loaded existing brain.")
         except:
             print("Starting fresh.")
+    return agent
+
+def resume_checkpoint(agent, engine=None, episodes=EPISODES, resume=RESUME) -> int:
+    """
+    Restores the last checkpoint into agent (and engine, for train()).
+    Returns the episodes already done, 0 for a new run.
+    """
+    saved = checkpoint.load() if resume else None
+    if saved is None:
+        return 0
+    if saved["episode"] >= episodes:
+        # Like a run without a checkpoint: keep training the saved model
+        print(f"Checkpoint already finished ({saved['episode']}/{episodes} episodes); starting a new run.")
+        return 0
+    done = checkpoint.restore(agent, saved, engine)
+    print(f"Resumed after episode {done} (epsilon {agent.epsilon:.2f}).")
+    return done
+
+def train(resume=RESUME):
+    print("--- Initializing Strategy Training (Set Completer) ---")
+    
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    print(f"Device: {device}")
+    
+    engine = TrainingEngine()
+    encoder = StateEncoder()
+    agent = load_agent(device)
+
+    # Resume: weights, Adam, epsilon, RNGs, engine and replay continue where the last run stopped
+    start = resume_checkpoint(agent, engine, resume=resume) + 1
+    checkpointer = checkpoint.Checkpointer()
 
-    for e in range(1, EPISODES + 1):
+    for e in range(start, EPISODES + 1):
         engine.reset()
         state = encoder.encode(engine.players[0], engine.players, engine.board.spaces)
         
@@ -154,9 +193,270 @@ def train():
             
         if e % 100 == 0:
             print(f"Ep {e}/{EPISODES} | Reward: {total_reward:.1f} | Epsilon: {agent.epsilon:.2f}")
-            agent.save("models/monopoly_ai_trading.pth")
 
+        # Checkpoint (snapshot here, written in the background)
+        if e % CHECKPOINT_EVERY == 0 or e == EPISODES:
+            checkpointer.save(checkpoint.capture(agent, e, engine, include_replay=CHECKPOINT_REPLAY))
+
+    checkpointer.close()
+    print("\n--- Strategy Training Complete ---")
+
+class EnvBatch:
+    """
+    num_envs TrainingEngine games stepped in lockstep, with the same game, actions and
+    rewards as train(). Each step encodes every game's state into one matrix and picks
+    all actions in one forward pass; finished games are restarted in place.
+
+    self_play=True: every seat acts on its own view of the board (not player 0's) and
+    every seat's turn becomes a transition, about 4x the experience per simulated turn.
+    A seat's own bankruptcy ends its episode; turns skipped while bankrupt are not stored.
+    """
+
+    def __init__(self, num_envs, self_play=False):
+        self.self_play = self_play
+        self.engines = [TrainingEngine() for _ in range(num_envs)]
+        self.encoder = StateEncoder()
+        # Player 0's latest state per game: what the policy acts on (as in train())
+        self.states = self.encoder.encode_batch(
+            [(en.players[0], en.players, en.board.spaces) for en in self.engines]
+        ).copy()
+        self.step_counts = np.zeros(num_envs, dtype=np.int64)
+        self.total_rewards = np.zeros(num_envs)
+
+    def step(self, agent):
+        """
+        One turn in every game. Returns (transitions, finished): the learning seats'
+        transitions as (states, actions, rewards, next_states, dones) arrays, or None if
+        none of them moved this step, and player 0's total reward of each game that ended.
+        """
+        # 1. AI Actions for every game in one forward pass
+        if self.self_play:
+            # Each game's current seat, from its own point of view
+            self.states = self.encoder.encode_batch(
+                [(en.players[en.current_player_idx], en.players, en.board.spaces) for en in self.engines]
+            ).copy()
+        actions = agent.act_batch(self.states)
+
+        # 2-4. Configure, execute the turn and handle TRADING, game by game
+        movers, logs, trades = [], [], []
+        for engine, action in zip(self.engines, actions.tolist()):
+            current_player = engine.players[engine.current_player_idx]
+            engine.set_ai_decision(action)
+            log = engine.run_turn()
+            trade_happened = False
+            if action == 2 and not engine.game_over:
+                success, msg = engine.try_smart_trade(current_player.id)
+                if success:
+                    trade_happened = True
+                    log['result'] = msg
+            movers.append(current_player)
+            logs.append(log)
+            trades.append(trade_happened)
+        self.step_counts += 1
+
+        # 5. Reward: one encode for all next states, then the learning seats' transitions
+        next_states = self.encoder.encode_batch(
+            [(p, en.players, en.board.spaces) for p, en in zip(movers, self.engines)]
+        )
+        dones = np.array([en.game_over for en in self.engines])
+        if self.self_play:
+            learners = [i for i, log in enumerate(logs) if log.get('event') != "skip_bankrupt"]
+            seat_dones = dones | np.array([p.bankrupt for p in movers])
+        else:
+            learners = [i for i, p in enumerate(movers) if p.id == 0]
+            seat_dones = dones
+        learners = np.array(learners, dtype=np.int64)
+        transitions = None
+        if len(learners):
+            rewards = np.array([calculate_reward(movers[i], self.states[i], logs[i], trades[i]) for i in learners])
+            transitions = (self.states[learners], actions[learners], rewards,
+                           next_states[learners], seat_dones[learners])
+            # Episode rewards are reported for player 0 in both modes
+            own = np.array([movers[i].id == 0 for i in learners])
+            self.total_rewards[learners[own]] += rewards[own]
+            if not self.self_play:
+                self.states[learners] = next_states[learners]
+
+        # 6. Finished games restart in place
+        finished = []
+        for i in np.flatnonzero(dones | (self.step_counts >= MAX_STEPS_PER_GAME)):
+            finished.append(self.total_rewards[i])
+            engine = self.engines[i]
+            engine.reset()
+            self.states[i] = self.encoder.encode(engine.players[0], engine.players, engine.board.spaces)
+            self.step_counts[i] = 0
+            self.total_rewards[i] = 0
+        return transitions, finished
+
+def train_vectorized(num_envs=NUM_ENVS, episodes=EPISODES, resume=RESUME):
+    """
+    train() with num_envs games stepped together (EnvBatch). Each step's transitions are
+    pushed in bulk, followed by UPDATES_PER_TRANSITION gradient steps of 32 samples per
+    new transition (1 = the same updates as train(); lower trades learning for speed).
+    Runs until `episodes` games have ended. Checkpoints like train(); on resume the
+    games that were in flight are simply restarted.
+    """
+    print(f"--- Initializing Strategy Training (Set Completer, {num_envs} envs) ---")
+
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    print(f"Device: {device}")
+
+    envs = EnvBatch(num_envs, self_play=SELF_PLAY)
+    agent = load_agent(device)
+    e = resume_checkpoint(agent, episodes=episodes, resume=resume)
+    checkpointer = checkpoint.Checkpointer()
+    owed_updates = 0.0
+
+    while e < episodes:
+        transitions, finished = envs.step(agent)
+        if transitions is not None:
+            agent.remember_batch(*transitions)
+            owed_updates += UPDATES_PER_TRANSITION * len(transitions[1])
+            while owed_updates >= 1:
+                agent.replay(32)
+                owed_updates -= 1
+
+        # Epsilon Decay & Feedback per finished game
+        for total_reward in finished[:episodes - e]:
+            e += 1
+            if agent.epsilon > EPSILON_END:
+                agent.epsilon *= EPSILON_DECAY
+
+            if e % 10 == 0:
+                print(f"Ep {e}...", end="\r")
+
+            if e % 100 == 0:
+                print(f"Ep {e}/{episodes} | Reward: {total_reward:.1f} | Epsilon: {agent.epsilon:.2f}")
+
+            if e % CHECKPOINT_EVERY == 0 or e == episodes:
+                checkpointer.save(checkpoint.capture(agent, e, include_replay=CHECKPOINT_REPLAY))
+
+    checkpointer.close()
+    print("\n--- Strategy Training Complete ---")
+
+# --- ACTOR / LEARNER ---
+# train_distributed: NUM_ACTORS processes each play an EnvBatch of ENVS_PER_ACTOR games with
+# their own copy of the network and write transitions into a shared-memory replay buffer.
+# This process is the learner: it samples that buffer, trains, and publishes new weights
+# every PUBLISH_EVERY updates; actors pick them up before their next step.
+
+def _actor(actor_id, num_envs, buffer, shared_model, version, episodes_done, last_reward, stop, epsilon,
+           episodes, first_episode=0, self_play=False):
+    torch.set_num_threads(1)  # One core per actor; parallelism comes from the processes
+    buffer.writer(actor_id)
+    agent = Agent(state_size=176, action_size=3, device=torch.device("cpu"), memory_size=1)
+    envs = EnvBatch(num_envs, self_play=self_play)
+    seen = -1
+
+    while not stop.is_set():
+        # 1. Sync weights if the learner published new ones
+        if version.value != seen:
+            with version.get_lock():
+                agent.model.load_state_dict(shared_model.state_dict())
+                seen = version.value
+
+        # 2. Same epsilon schedule as train(), driven by the global episode count
+        agent.epsilon = max(EPSILON_END, epsilon * EPSILON_DECAY ** (episodes_done.value - first_episode))
+
+        # 3. Play one step of every game and hand the experience to the learner
+        transitions, finished = envs.step(agent)
+        if transitions is not None:
+            buffer.push_batch(*transitions)
+        if finished:
+            # Count only up to the target, so the run ends at exactly `episodes`
+            with episodes_done.get_lock():
+                counted = min(len(finished), episodes - episodes_done.value)
+                if counted > 0:
+                    episodes_done.value += counted
+                    last_reward.value = finished[counted - 1]
+                if episodes_done.value >= episodes:
+                    return
+
+def train_distributed(num_actors=NUM_ACTORS, episodes=EPISODES, envs_per_actor=ENVS_PER_ACTOR, resume=RESUME):
+    print(f"--- Initializing Strategy Training (Set Completer, {num_actors} actors x {envs_per_actor} envs) ---")
+
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    print(f"Device: {device}")
+
+    ctx = mp.get_context("spawn")
+    agent = load_agent(device)
+    buffer = SharedReplayBuffer(MEMORY_SIZE, 176, writers=num_actors, ctx=ctx)
+    agent.memory = buffer  # Agent.replay now samples what the actors wrote
+
+    # Resume before the actors start (the saved replay is spread over their segments);
+    # games that were in flight are restarted
+    start = resume_checkpoint(agent, episodes=episodes, resume=resume)
+    restored = buffer.total_pushed()
+    epsilon = agent.epsilon  # Actors decay it from here by the global episode count
+    checkpointer = checkpoint.Checkpointer()
+
+    shared_model = MonopolyNet(176, 3)
+    shared_model.load_state_dict(agent.model.state_dict())
+    shared_model.share_memory()
+    version = ctx.Value('q', 0)
+    episodes_done = ctx.Value('q', start)
+    last_reward = ctx.Value('d', 0.0)
+    stop = ctx.Event()
+
+    actors = [
+        ctx.Process(target=_actor, daemon=True, args=(
+            i, envs_per_actor, buffer, shared_model, version, episodes_done, last_reward, stop, epsilon,
+            episodes, start, SELF_PLAY
+        ))
+        for i in range(num_actors)
+    ]
+    for actor in actors:
+        actor.start()
+
+    updates = 0
+    reported = start // 100
+    checkpointed = start // CHECKPOINT_EVERY
+    try:
+        while episodes_done.value < episodes:
+            # Actors exit cleanly (code 0) once the target is counted; anything else is a crash
+            if any(actor.exitcode not in (None, 0) for actor in actors):
+                raise RuntimeError("An actor process died; see its traceback above.")
+
+            # 1. Learn, with the same updates per transition as train_vectorized
+            if len(buffer) < 64 or updates >= UPDATES_PER_TRANSITION * (buffer.total_pushed() - restored):
+                time.sleep(0.001)
+            else:
+                agent.replay(32)
+                updates += 1
+
+                # 2. Publish Weights
+                if updates % PUBLISH_EVERY == 0:
+                    with version.get_lock():
+                        shared_model.load_state_dict(agent.model.state_dict())
+                        version.value += 1
+
+            # 3. Feedback & Checkpoint
+            e = episodes_done.value
+            agent.epsilon = max(EPSILON_END, epsilon * EPSILON_DECAY ** (e - start))
+            if e // 100 > reported:
+                reported = e // 100
+                print(f"Ep {e}/{episodes} | Reward: {last_reward.value:.1f} | "
+                      f"Epsilon: {agent.epsilon:.2f} | Updates: {updates}")
+            if e // CHECKPOINT_EVERY > checkpointed:
+                checkpointed = e // CHECKPOINT_EVERY
+                checkpointer.save(checkpoint.capture(agent, e, include_replay=CHECKPOINT_REPLAY))
+    finally:
+        stop.set()
+        for actor in actors:
+            actor.join(timeout=10)
+            if actor.is_alive():
+                actor.terminate()
+
+    e = episodes_done.value
+    agent.epsilon = max(EPSILON_END, epsilon * EPSILON_DECAY ** (e - start))
+    checkpointer.save(checkpoint.capture(agent, e, include_replay=CHECKPOINT_REPLAY))
+    checkpointer.close()
     print("\n--- Strategy Training Complete ---")
 
 if __name__ == "__main__":
-    train()
\ No newline at end of file
+    if NUM_ACTORS > 0:
+        train_distributed()
+    elif NUM_ENVS > 1:
+        train_vectorized()
+    else:
+        train()
\ No newline at end of file
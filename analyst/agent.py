@@ -1,29 +1,30 @@
-import csv
 import requests
 import json
 import random
 from collections import defaultdict
+from simulation.writers import detect_format, read_rows, read_table
 
 # --- CONFIGURATION ---
-CSV_FILE = "data/monopoly_smart_data.csv"
+DATA_FILE = "data/monopoly_smart_data.parquet"  # .parquet or .csv
 OLLAMA_URL = "http://localhost:11435/api/generate"
 MODEL = "llama3"
 
 def get_game_data(game_id=None):
     """
-    Parses the CSV and retrieves rows for a specific game.
+    Reads the simulation log and retrieves rows for a specific game.
     If no game_id is provided, picks one with a Trade in it (more interesting).
     """
+    if detect_format(DATA_FILE) == "parquet":
+        return _parquet_game(game_id)
+
     games = defaultdict(list)
     interesting_games = []
     
-    with open(CSV_FILE, 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            g_id = row['game_id']
-            games[g_id].append(row)
-            if row['decision'] == 'TRADE_ATTEMPT' and g_id not in interesting_games:
-                interesting_games.append(g_id)
+    for row in read_rows(DATA_FILE):
+        g_id = row['game_id']
+        games[g_id].append(row)
+        if row['decision'] == 'TRADE_ATTEMPT' and g_id not in interesting_games:
+            interesting_games.append(g_id)
     
     if not game_id:
         # Pick a random game that had a trade attempt
@@ -35,6 +36,19 @@ def get_game_data(game_id=None):
     print(f"--- Analyzing Game ID: {game_id} ---")
     return games[game_id]
 
+def _parquet_game(game_id=None):
+    """Same as get_game_data, but only the chosen game's rows become Python dicts."""
+    import pyarrow.compute as pc
+
+    if not game_id:
+        table = read_table(DATA_FILE, columns=['game_id', 'decision'])
+        traded = table.filter(pc.equal(table['decision'], 'TRADE_ATTEMPT'))['game_id']
+        candidates = pc.unique(traded if len(traded) else table['game_id']).to_pylist()
+        game_id = random.choice(candidates)
+
+    print(f"--- Analyzing Game ID: {game_id} ---")
+    return read_table(DATA_FILE, filters=[('game_id', '=', int(game_id))]).to_pylist()
+
 def summarize_game(rows):
     """
     Condenses 1000+ turns into a 'Highlight Reel' for the LLM.
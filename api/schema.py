@@ -1,13 +1,13 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 class GameStateRequest(BaseModel):
     state_vector: List[float] = Field(
         ..., 
-        description="A list of 205 floating point numbers representing the encoded board state.",
-        min_items=205,
-        max_items=205
+        description="The encoded board state (StateEncoder output, 176 floats for the current model). "
+                    "The length is checked against the loaded model."
     )
+    model: Optional[str] = Field(None, description="Model name from GET /models (default model if omitted).")
 
 class DecisionResponse(BaseModel):
     recommendation: str  # "BUY", "PASS", or "TRADE"
@@ -16,4 +16,17 @@ class DecisionResponse(BaseModel):
 
 class AnalysisResponse(BaseModel):
     decision: DecisionResponse
-    narrative: str
\ No newline at end of file
+    narrative: str
+
+class BatchStateRequest(BaseModel):
+    states: List[List[float]] = Field(
+        ...,
+        description="N encoded board states: a list of state vectors, i.e. an [N, F] matrix.",
+        min_length=1
+    )
+    include_narrative: bool = False  # Narratives are skipped by default (hot path)
+    model: Optional[str] = Field(None, description="Model name from GET /models (default model if omitted).")
+
+class BatchAnalysisResponse(BaseModel):
+    decisions: List[DecisionResponse]
+    narratives: Optional[List[str]] = None
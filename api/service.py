@@ -1,24 +1,184 @@
+import asyncio
+import functools
+import os
+from contextlib import asynccontextmanager
+import numpy as np
 from fastapi import FastAPI, HTTPException
-from ai.inference import MonopolyExpert
-from api.schema import GameStateRequest, AnalysisResponse, DecisionResponse
+from ai.inference import PredictionCache
+from ai.registry import ModelRegistry
+from api.schema import (
+    GameStateRequest, AnalysisResponse, DecisionResponse,
+    BatchStateRequest, BatchAnalysisResponse
+)
 
-app = FastAPI(title="LucenFlow Monopoly Expert API")
+# --- SETTINGS ---
+# Every checkpoint in MODELS_DIR is servable by name (file name without extension, e.g.
+# "monopoly_ai_500" or "monopoly_ai_trading.int8"); requests without a model get DEFAULT_MODEL.
+# Models load on first use, at most MAX_RESIDENT_MODELS stay in memory (least recently used
+# are dropped), and a checkpoint rewritten on disk is picked up on its next request.
+MODELS_DIR = os.environ.get("EXPERT_MODELS_DIR", "models")
+DEFAULT_MODEL = os.environ.get("EXPERT_DEFAULT_MODEL", "monopoly_ai_trading")
+MAX_RESIDENT_MODELS = int(os.environ.get("EXPERT_MAX_RESIDENT_MODELS", 4))
+BACKEND = os.environ.get("EXPERT_BACKEND", "numpy")  # .pth checkpoints: "numpy" (via .npz, serves any layout) or "torch"
 
-# Initialize the Expert
-expert = MonopolyExpert(model_path="models/monopoly_ai_trading.pth")
+# Single-state requests are coalesced into one forward pass once MAX_BATCH_SIZE requests
+# are queued or the oldest has waited MAX_WAIT_MS. MAX_BATCH_SIZE=1 disables batching.
+MAX_BATCH_SIZE = int(os.environ.get("EXPERT_MAX_BATCH_SIZE", 64))
+MAX_WAIT_MS = float(os.environ.get("EXPERT_MAX_WAIT_MS", 2.0))
 
-@app.get("/")
-def health_check():
-    return {"status": "active", "version": "2.0", "model": "DQN-Trading"}
+# Response cache keyed on quantized state vectors, one per model. CACHE_SIZE=0 disables it.
+CACHE_SIZE = int(os.environ.get("EXPERT_CACHE_SIZE", 10000))
+CACHE_TTL_S = float(os.environ.get("EXPERT_CACHE_TTL_S", 300.0))
+CACHE_PRECISION = float(os.environ.get("EXPERT_CACHE_PRECISION", 1e-4))
 
-@app.post("/analyze/decision", response_model=AnalysisResponse)
-def analyze_decision(request: GameStateRequest):
+# Initialize the Registry (the default model is loaded up front so a bad deploy fails at start)
+registry = ModelRegistry(
+    MODELS_DIR, default=DEFAULT_MODEL, max_resident=MAX_RESIDENT_MODELS, backend=BACKEND,
+    cache_factory=(lambda: PredictionCache(CACHE_SIZE, CACHE_TTL_S, CACHE_PRECISION)) if CACHE_SIZE > 0 else None
+)
+registry.get()
+
+class MicroBatcher:
     """
-    Unified Endpoint: Ask the AI what to do (Buy, Pass, or Trade).
+    Dynamic micro-batching for single-state requests.
+    Handlers await submit(); a background task drains the queue into batches and runs
+    each batch through predict_batch in a worker thread, so the event loop keeps
+    accepting (and queueing) requests while the model runs.
     """
-    result = expert.predict(request.state_vector)
-    
-    # Dynamic Narrative
+
+    def __init__(self, predict_batch, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = None
+        self.task = None
+        self.batches = 0
+        self.requests = 0
+
+    async def submit(self, state: np.ndarray) -> dict:
+        """Queues one validated [1, F] state and waits for its result."""
+        if self.task is None:
+            # Started lazily so the queue belongs to the running event loop
+            self.queue = asyncio.Queue()
+            self.task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((state, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # 1. Wait for the first request, then collect more until full or out of time
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # 2. One forward pass (off the event loop)
+            states = np.concatenate([state for state, _ in batch])
+            try:
+                results = await loop.run_in_executor(None, self.predict_batch, states)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.requests += len(batch)
+
+            # 3. Fan the results back out (skipping requests whose client went away)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+def _predict_misses(name, states):
+    # The handler checks the cache first, so batches only hold misses (no second lookup).
+    # The expert is looked up per batch, so a hot reload takes effect on the next batch.
+    return registry.get(name).predict_batch(states, lookup=False)
+
+batchers = {}  # model name -> MicroBatcher
+
+def get_batcher(name) -> MicroBatcher:
+    if name not in batchers:
+        batchers[name] = MicroBatcher(functools.partial(_predict_misses, name))
+    return batchers[name]
+
+def get_expert(name):
+    """(name, expert) for a request's model field, or an HTTP error. May load the model."""
+    try:
+        name = registry.resolve(name)
+        return name, registry.get(name)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Model '{name}' failed to load: {e}")
+
+async def get_expert_async(name):
+    """
+    get_expert for async handlers: a resident, unchanged model is returned directly; a first
+    load, hot reload or .npz conversion (seconds) runs in a worker thread so the event loop
+    and the micro-batchers keep running.
+    """
+    try:
+        expert = registry.peek(name)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    if expert is not None:
+        return registry.resolve(name), expert
+    return await asyncio.to_thread(get_expert, name)
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    for batcher in batchers.values():
+        await batcher.stop()
+
+app = FastAPI(title="LucenFlow Monopoly Expert API", lifespan=lifespan)
+
+@app.get("/")
+def health_check():
+    expert = registry.get()
+    return {"status": "active", "version": "2.0", "model": "DQN-Trading",
+            "default_model": registry.default, "variant": expert.variant}
+
+@app.get("/models")
+def list_models():
+    """Every servable model and whether it is currently loaded."""
+    return {"default": registry.default, "models": registry.info()}
+
+@app.get("/stats")
+def stats():
+    """Per-model cache hit/miss counters and micro-batching totals."""
+    with registry.lock:
+        resident = {name: expert for name, (_, expert) in registry.resident.items()}
+    return {
+        "models": {
+            name: {
+                "cache": expert.cache.stats() if expert.cache is not None else None,
+                "batches": batchers[name].batches if name in batchers else 0,
+                "batched_requests": batchers[name].requests if name in batchers else 0
+            }
+            for name, expert in resident.items()
+        }
+    }
+
+def build_narrative(result: dict) -> str:
+    """Dynamic Narrative for one prediction."""
     rec = result['recommendation']
     conf = result['confidence_score']
     q = result['q_values']
@@ -38,14 +198,46 @@ def analyze_decision(request: GameStateRequest):
             f"The Expert recommends PASSING. "
             f"Conserving cash is currently prioritized over this investment."
         )
-    
+    return narrative
+
+@app.post("/analyze/decision", response_model=AnalysisResponse)
+async def analyze_decision(request: GameStateRequest):
+    """
+    Unified Endpoint: Ask the AI what to do (Buy, Pass, or Trade).
+    Concurrent requests share forward passes through the micro-batcher.
+    """
+    name, expert = await get_expert_async(request.model)
+    try:
+        # Validated here so one bad request can't fail the batch it would join
+        state = expert.as_batch(request.state_vector)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    result = expert.cached(state)
+    if result is None:
+        result = await get_batcher(name).submit(state)
+
     decision_data = DecisionResponse(
-        recommendation=rec,
-        confidence_score=conf,
-        q_values=q
+        recommendation=result['recommendation'],
+        confidence_score=result['confidence_score'],
+        q_values=result['q_values']
     )
     
-    return AnalysisResponse(decision=decision_data, narrative=narrative)
+    return AnalysisResponse(decision=decision_data, narrative=build_narrative(result))
+
+@app.post("/analyze/decisions", response_model=BatchAnalysisResponse)
+def analyze_decisions(request: BatchStateRequest):
+    """
+    Batch Endpoint: N states (e.g. a whole table) in one request and one forward pass.
+    Narratives are only generated when include_narrative is set.
+    """
+    _, expert = get_expert(request.model)
+    try:
+        results = expert.predict_batch(request.states)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    narratives = [build_narrative(r) for r in results] if request.include_narrative else None
+    return BatchAnalysisResponse(decisions=results, narratives=narratives)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,25 +1,41 @@
-import csv
 from collections import Counter
+from simulation.writers import detect_format, read_rows, read_table
 
-FILE = "data/monopoly_smart_data.csv"
+FILE = "data/monopoly_smart_data.parquet"
+COLUMNS = ['player_id', 'decision', 'result', 'victory_status']
 
-def analyze_data():
-    print(f"--- Analyzing {FILE} ---")
-    
+def _value_counts(column) -> Counter:
+    counts = column.value_counts()
+    return Counter(dict(zip(counts.field('values').to_pylist(), counts.field('counts').to_pylist())))
+
+def count_parquet(path):
+    """Columnar counts: only the needed columns are read and nothing becomes a Python row."""
+    import pyarrow.compute as pc
+
+    table = read_table(path, columns=COLUMNS)
+    won = table.filter(pc.equal(table['victory_status'], 'WINNER'))
+    return table.num_rows, _value_counts(table['decision']), _value_counts(table['result']), \
+        _value_counts(won['player_id'])
+
+def count_csv(path):
     decisions = Counter()
     results = Counter()
     winners = Counter()
+    row_count = 0
+    for row in read_rows(path, columns=COLUMNS):
+        row_count += 1
+        decisions[row['decision']] += 1
+        results[row['result']] += 1
+        if row['victory_status'] == 'WINNER':
+            winners[row['player_id']] += 1
+    return row_count, decisions, results, winners
+
+def analyze_data():
+    print(f"--- Analyzing {FILE} ---")
     
     try:
-        with open(FILE, 'r') as f:
-            reader = csv.DictReader(f)
-            row_count = 0
-            for row in reader:
-                row_count += 1
-                decisions[row['decision']] += 1
-                results[row['result']] += 1
-                if row['victory_status'] == 'WINNER':
-                    winners[row['player_id']] += 1
+        scan = count_parquet if detect_format(FILE) == "parquet" else count_csv
+        row_count, decisions, results, winners = scan(FILE)
                     
         print(f"Total Rows Scanned: {row_count}")
         print("\n--- Decision Breakdown ---")
@@ -7,11 +7,11 @@ API_URL = "http://localhost:8000/analyze/decision"
 
 def generate_mock_state():
     """
-    Generates a random vector of 205 floats to simulate a game state.
+    Generates a random vector of 176 floats to simulate a game state.
     In the real app, the StateEncoder would generate this from the live game.
     """
-    # 205 is the exact input size expected by the model
-    return [random.random() for _ in range(205)]
+    # 176 is the exact input size expected by the model (StateEncoder output)
+    return [random.random() for _ in range(176)]
 
 def test_expert():
     print("--- Testing Digital Expert API ---")
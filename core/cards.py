@@ -1,60 +1,177 @@
 import json
-import random
 import os
-from collections import deque
+import numpy as np
+from .dice import make_rng
 
-class CardDeck:
-    def __init__(self, deck_file: str):
-        self.cards = deque()
-        self._load_deck(deck_file)
-        self.shuffle()
+# --- CARD ACTION CODES ---
+# Decks are compiled once into parallel integer arrays (action, value, extra) so the
+# turn loop never compares strings and whole batches of games can draw at once.
+CARD_MOVE_ABS = 0      # value = target space
+CARD_MOVE_REL = 1      # value = steps (negative = backwards)
+CARD_MOVE_NEAREST = 2  # value = NEAREST_*, extra = MODIFIER_*
+CARD_EARN = 3          # value = amount
+CARD_PAY = 4           # value = amount
+CARD_JAIL_FREE = 5
+CARD_GO_JAIL = 6
+CARD_REPAIRS = 7       # value = per house, extra = per hotel
+CARD_PAY_ALL = 8       # value = paid to each other player
+CARD_EARN_ALL = 9      # value = received from each other player
+
+ACTION_CODES = {
+    "move_abs": CARD_MOVE_ABS, "move_rel": CARD_MOVE_REL, "move_nearest": CARD_MOVE_NEAREST,
+    "earn": CARD_EARN, "pay": CARD_PAY, "jail_free": CARD_JAIL_FREE, "go_jail": CARD_GO_JAIL,
+    "repairs": CARD_REPAIRS, "pay_all": CARD_PAY_ALL, "earn_all": CARD_EARN_ALL
+}
+
+NEAREST_STATION = 0
+NEAREST_UTILITY = 1
+
+MODIFIER_NONE = 0
+MODIFIER_DOUBLE_RENT = 1
+MODIFIER_TEN_TIMES = 2
+
+_MODIFIER_CODES = {"double_rent": MODIFIER_DOUBLE_RENT, "ten_times": MODIFIER_TEN_TIMES}
+
+_COMPILED = {}
+
+class CompiledDeck:
+    """Integer encoding of one deck file. Shared (read-only) by every deck instance."""
 
-    def _load_deck(self, file_path: str):
+    def __init__(self, cards: list):
+        self.ids = [card['id'] for card in cards]
+        self.texts = [card['text'] for card in cards]
+        self.action = np.zeros(len(cards), dtype=np.int64)
+        self.value = np.zeros(len(cards), dtype=np.int64)
+        self.extra = np.zeros(len(cards), dtype=np.int64)
+
+        for i, card in enumerate(cards):
+            self.action[i] = ACTION_CODES[card['action']]
+            value = card['value']
+            if card['action'] == 'move_nearest':
+                self.value[i] = NEAREST_STATION if value == 'station' else NEAREST_UTILITY
+                self.extra[i] = _MODIFIER_CODES.get(card.get('modifier'), MODIFIER_NONE)
+            elif card['action'] == 'repairs':
+                self.value[i] = value['house']
+                self.extra[i] = value['hotel']
+            else:
+                self.value[i] = value
+
+        jail_cards = np.flatnonzero(self.action == CARD_JAIL_FREE)
+        self.jail_card = int(jail_cards[0]) if len(jail_cards) else -1
+        self.size = len(cards)
+
+def compile_deck(file_path: str) -> CompiledDeck:
+    """Loads and encodes a deck file once per process."""
+    if file_path not in _COMPILED:
         base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        full_path = os.path.join(base_path, file_path)
-        
-        with open(full_path, 'r', encoding='utf-8') as f:
-            card_list = json.load(f)
-            for card in card_list:
-                self.cards.append(card)
+        with open(os.path.join(base_path, file_path), 'r', encoding='utf-8') as f:
+            _COMPILED[file_path] = CompiledDeck(json.load(f))
+    return _COMPILED[file_path]
+
+class CardDeck:
+    """
+    One deck for one game: an index array into the compiled cards plus a cursor.
+    The "Get Out of Jail Free" card is tracked through `held`, a bitmask of the
+    players holding it; while held it is skipped by draw().
+    """
+
+    def __init__(self, deck_file: str, rng=None):
+        self.rng = rng if rng is not None else make_rng()
+        self.compiled = compile_deck(deck_file)
+        self.action = self.compiled.action.tolist()
+        self.value = self.compiled.value.tolist()
+        self.extra = self.compiled.extra.tolist()
+        self.order = []
+        self.cursor = 0
+        self.held = 0
+        self.shuffle()
 
     def shuffle(self):
-        """Randomizes the order of the deck."""
-        temp_list = list(self.cards)
-        random.shuffle(temp_list)
-        self.cards = deque(temp_list)
-
-    def draw(self):
-        """Draws the top card. If it's not 'Get Out of Jail Free', it goes to the bottom."""
-        if not self.cards:
-            return None
-        
-        card = self.cards.popleft()
-        
-        # If it is NOT a "Get Out of Jail Free" card, put it back at the bottom immediately.
-        # If it IS a GOOJF card, the player keeps it, so we don't return it to the deck yet.
-        if card['action'] != 'jail_free':
-            self.cards.append(card)
-            
-        return card
+        """Randomizes the order of the deck using the deck's generator."""
+        self.order = self.rng.permutation(self.compiled.size).tolist()
+        self.cursor = 0
+        self.held = 0
+
+    def draw(self, player_id=0):
+        """Returns the index of the top card and cycles it to the bottom."""
+        while True:
+            card = self.order[self.cursor]
+            self.cursor = (self.cursor + 1) % self.compiled.size
+            if card != self.compiled.jail_card:
+                return card
+            if not self.held:
+                # The player keeps it, so it leaves the deck until returned.
+                self.held |= 1 << player_id
+                return card
 
-    def return_jail_card(self, card):
+    def holds_jail_card(self, player_id):
+        return bool(self.held >> player_id & 1)
+
+    def return_jail_card(self, player_id):
         """Used when a player plays or sells a Get Out of Jail Free card."""
-        self.cards.append(card)
+        self.held &= ~(1 << player_id)
+
+    def describe(self, card):
+        return self.compiled.texts[card]
 
 class CardManager:
-    def __init__(self):
-        self.chance = CardDeck("data/chance_deck.json")
-        self.community_chest = CardDeck("data/comm_chest.json")
+    def __init__(self, rng=None):
+        # Both decks share one generator so a seeded engine fixes the card order too
+        rng = rng if rng is not None else make_rng()
+        self.chance = CardDeck("data/chance_deck.json", rng)
+        self.community_chest = CardDeck("data/comm_chest.json", rng)
 
-    def draw_chance(self):
-        return self.chance.draw()
+    def reseed(self, rng):
+        """Reshuffles both decks (Chance first) from a new game's generator."""
+        for deck in (self.chance, self.community_chest):
+            deck.rng = rng
+            deck.shuffle()
 
-    def draw_community_chest(self):
-        return self.community_chest.draw()
-    
-    def return_jail_card(self, card, deck_type):
+    def draw_chance(self, player_id=0):
+        return self.chance.draw(player_id)
+
+    def draw_community_chest(self, player_id=0):
+        return self.community_chest.draw(player_id)
+
+    def return_jail_card(self, player_id, deck_type):
         if deck_type == 'chance':
-            self.chance.return_jail_card(card)
+            self.chance.return_jail_card(player_id)
         else:
-            self.community_chest.return_jail_card(card)
\ No newline at end of file
+            self.community_chest.return_jail_card(player_id)
+
+class BatchCardDeck:
+    """
+    The same deck for N games at once: order[N, cards], cursor[N], held[N].
+    draw() serves every requested game in one vectorized operation.
+    """
+
+    def __init__(self, deck_file: str, num_games: int):
+        self.compiled = compile_deck(deck_file)
+        self.order = np.zeros((num_games, self.compiled.size), dtype=np.int64)
+        self.cursor = np.zeros(num_games, dtype=np.int64)
+        self.held = np.zeros(num_games, dtype=np.int64)
+
+    def shuffle(self, game, rng):
+        """Shuffles one game's deck (same call sequence as CardDeck.shuffle)."""
+        self.order[game] = rng.permutation(self.compiled.size)
+        self.cursor[game] = 0
+        self.held[game] = 0
+
+    def draw(self, games, players):
+        """Draws the top card for each listed game. Returns card indices [len(games)]."""
+        size = self.compiled.size
+        card = self.order[games, self.cursor[games]]
+        # A held jail card is not in the deck: skip to the next card (only one per deck)
+        skip = (card == self.compiled.jail_card) & (self.held[games] != 0)
+        self.cursor[games] = (self.cursor[games] + 1 + skip) % size
+        card = np.where(skip, self.order[games, (self.cursor[games] - 1) % size], card)
+
+        taken = card == self.compiled.jail_card
+        self.held[games[taken]] |= np.left_shift(1, players[taken])
+        return card
+
+    def holds_jail_card(self, games, players):
+        return (self.held[games] >> players) & 1 == 1
+
+    def return_jail_card(self, games, players):
+        self.held[games] &= ~np.left_shift(1, players)
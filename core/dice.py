@@ -1,20 +1,53 @@
-import random
+import numpy as np
+
+DICE_BLOCK = 1024  # Rolls drawn from the generator per refill
+
+def make_rng(seed=None, game_id=None):
+    """
+    Returns a NumPy Generator for one game.
+    The same (seed, game_id) pair always reproduces the same stream, so any game in
+    a batch can be replayed on its own.
+    """
+    if game_id is None:
+        return np.random.default_rng(seed)
+    return np.random.default_rng([seed, game_id])
+
+FORK_STREAM = 0xF0  # Spawn-key namespace of fork streams
+
+def make_fork_rng(seed, game_id, fork_id):
+    """
+    Returns the Generator for fork `fork_id` of game (seed, game_id). Fork streams live
+    under their own spawn key, so they never coincide with a make_rng(seed, n) game
+    stream (or with the forks of another game).
+    """
+    entropy = seed if game_id is None else [seed, game_id]
+    return np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(FORK_STREAM, fork_id)))
+
+def roll_block(rng, size=DICE_BLOCK):
+    """Draws `size` rolls of two dice in one call. Returns an int array of shape [size, 2]."""
+    return rng.integers(1, 7, size=(size, 2))
 
 class Dice:
-    def __init__(self):
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else make_rng()
         self.die1 = 0
         self.die2 = 0
         self.doubles_count = 0  # Tracks consecutive doubles (3 = Jail)
+        self._block = []
+        self._cursor = 0
 
     def roll(self):
         """
-        Rolls two 6-sided dice.
+        Rolls two 6-sided dice (consumed from a pre-generated block).
         Returns:
             total (int): Sum of dice
             is_double (bool): True if die1 == die2
         """
-        self.die1 = random.randint(1, 6)
-        self.die2 = random.randint(1, 6)
+        if self._cursor >= len(self._block):
+            self._block = roll_block(self.rng).tolist()
+            self._cursor = 0
+        self.die1, self.die2 = self._block[self._cursor]
+        self._cursor += 1
         
         is_double = (self.die1 == self.die2)
         
@@ -27,4 +60,4 @@ class Dice:
 
     def reset_doubles(self):
         """Force reset doubles count (used when turn ends or player goes to jail)."""
-        self.doubles_count = 0
\ No newline at end of file
+        self.doubles_count = 0
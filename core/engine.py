@@ -1,105 +1,402 @@
-import random
+import copy
 import json
+import numpy as np
 from .player import Player
+from .dice import DICE_BLOCK, make_fork_rng, make_rng, roll_block
+from .rules import load_rules, STATION_GROUP, UTILITY_GROUP
+from .cards import (
+    CardManager, CARD_MOVE_ABS, CARD_MOVE_REL, CARD_MOVE_NEAREST, CARD_EARN, CARD_PAY,
+    CARD_JAIL_FREE, CARD_GO_JAIL, CARD_REPAIRS, CARD_PAY_ALL, CARD_EARN_ALL,
+    NEAREST_STATION, MODIFIER_NONE, MODIFIER_DOUBLE_RENT, MODIFIER_TEN_TIMES
+)
 
-class Board:
-    def __init__(self):
-        self.spaces = self._init_spaces()
-        # Define color groups for "Set Completer" logic
-        self.color_groups = {
-            "Brown": [1, 3],
-            "L.Blue": [6, 8, 9],
-            "Pink": [11, 13, 14],
-            "Orange": [16, 18, 19],
-            "Red": [21, 23, 24],
-            "Yellow": [26, 27, 29],
-            "Green": [31, 32, 34],
-            "D.Blue": [37, 39]
-        }
+# --- STATIC BOARD LAYOUT (built once, shared by every Board) ---
+# Property names, prices and rent ladders come from the compiled London ruleset.
+RULES = load_rules()
 
-    def _init_spaces(self):
-        spaces = []
-        groups = ["Brown", "L.Blue", "Pink", "Orange", "Red", "Yellow", "Green", "D.Blue"]
-        group_prices = [60, 100, 140, 180, 220, 260, 300, 350] 
-        
-        for i in range(40):
-            space = {
-                "id": i,
-                "name": f"Space {i}",
-                "type": "property",
-                "price": 0,
-                "rent": 0,
-                "owner": None,
-                "houses": 0,
-                "mortgaged": False,
-                "group": None
-            }
-            
-            if i % 10 == 0:
-                space["type"] = "corner"
-                space["name"] = ["GO", "Jail", "Free Parking", "Go To Jail"][i//10]
-            elif i in [2, 7, 17, 22, 33, 36]:
-                space["type"] = "action"
-                space["name"] = "Community Chest" if i in [2, 17, 33] else "Chance"
-            elif i in [4, 38]:
-                space["type"] = "tax"
-                space["name"] = "Income Tax" if i == 4 else "Super Tax"
-                space["rent"] = 200 if i == 4 else 100
-            elif i in [5, 15, 25, 35]:
-                space["type"] = "railroad"
-                space["name"] = f"Station {i}"
-                space["price"] = 200
-                space["rent"] = 25
-                space["group"] = "Rail"
+# Define color groups for "Set Completer" logic
+COLOR_GROUPS = RULES.color_groups
+
+def _build_layout():
+    """Builds the immutable per-space columns (name, type, group, price, rent)."""
+    names, types, groups, prices, rents = [], [], [], [], []
+
+    for i in range(40):
+        space_type, group, price, rent = "property", None, 0, 0
+
+        if i % 10 == 0:
+            space_type = "corner"
+            name = ["GO", "Jail", "Free Parking", "Go To Jail"][i//10]
+        elif i in [2, 7, 17, 22, 33, 36]:
+            space_type = "action"
+            name = "Community Chest" if i in [2, 17, 33] else "Chance"
+        elif i in [4, 38]:
+            space_type = "tax"
+            name = "Income Tax" if i == 4 else "Super Tax"
+            rent = 200 if i == 4 else 100
+        else:
+            name = str(RULES.names[i])
+            price = int(RULES.price[i])
+            if i in [5, 15, 25, 35]:
+                space_type = "railroad"
+                group = STATION_GROUP
+                rent = int(RULES.station_rent[1])
             elif i in [12, 28]:
-                space["type"] = "utility"
-                space["name"] = "Utility"
-                space["price"] = 150
-                space["group"] = "Utility"
+                space_type = "utility"
+                group = UTILITY_GROUP
             else:
-                g_idx = 0
-                if i > 5: g_idx = 1
-                if i > 10: g_idx = 2
-                if i > 15: g_idx = 3 
-                if i > 20: g_idx = 4
-                if i > 25: g_idx = 5
-                if i > 30: g_idx = 6
-                if i > 35: g_idx = 7
-                
-                space["group"] = groups[g_idx]
-                space["price"] = group_prices[g_idx]
-                space["rent"] = int(space["price"] * 0.1)
-                space["name"] = f"{space['group']} Street {i}"
-                
-                if i == 39: space["name"] = "Mayfair"
-                if i == 37: space["name"] = "Park Lane"
-                if i == 19: space["name"] = "Vine Street" 
-
-            spaces.append(space)
-        return spaces
+                group = str(RULES.group_names[RULES.group[i]])
+                rent = int(RULES.rent[i, 0, 0])
+
+        names.append(name)
+        types.append(space_type)
+        groups.append(group)
+        prices.append(price)
+        rents.append(rent)
+
+    return tuple(names), tuple(types), tuple(groups), tuple(prices), tuple(rents)
+
+SPACE_NAMES, SPACE_TYPES, SPACE_GROUPS, SPACE_PRICES, SPACE_RENTS = _build_layout()
+
+# Rent lookup tables as plain lists (scalar indexing stays in Python ints)
+RENT_TABLE = RULES.rent.tolist()              # [space][houses][group complete]
+STATION_RENT = RULES.station_rent.tolist()    # by stations owned
+UTILITY_MULTIPLIER = RULES.utility_multiplier.tolist()  # by utilities owned
+STATION_SPACES = tuple(i for i, t in enumerate(SPACE_TYPES) if t == "railroad")
+UTILITY_SPACES = tuple(i for i, t in enumerate(SPACE_TYPES) if t == "utility")
+STATION_MASK = sum(1 << i for i, t in enumerate(SPACE_TYPES) if t == "railroad")
+UTILITY_MASK = sum(1 << i for i, t in enumerate(SPACE_TYPES) if t == "utility")
+
+_STATIC_FIELDS = {
+    "id": tuple(range(40)),
+    "name": SPACE_NAMES,
+    "type": SPACE_TYPES,
+    "group": SPACE_GROUPS,
+    "price": SPACE_PRICES,
+    "rent": SPACE_RENTS
+}
+_MUTABLE_FIELDS = ("owner", "houses", "mortgaged")
+
+# Ownership index: each color group as an index and a 40-bit space mask
+GROUP_NAMES = tuple(COLOR_GROUPS)
+GROUP_SIZES = tuple(len(ids) for ids in COLOR_GROUPS.values())
+GROUP_MASKS = tuple(sum(1 << i for i in ids) for ids in COLOR_GROUPS.values())
+SPACE_GROUP_INDEX = tuple(
+    next((g for g, ids in enumerate(COLOR_GROUPS.values()) if i in ids), -1) for i in range(40)
+)
+
+JAIL_POSITION = 10
+MAX_CARD_CHAIN = 2  # A card can move the player onto another card space at most this deep
+
+def nearest_space(position, targets):
+    """Next target space after position, wrapping past GO."""
+    for t in targets:
+        if t > position:
+            return t
+    return targets[0]
+
+_EMPTY_OWNERS = (None,) * 40
+_EMPTY_HOUSES = (0,) * 40
+_EMPTY_MORTGAGES = (False,) * 40
+
+class Space:
+    """
+    Lightweight record for one board square.
+    Static fields are read from the shared layout, mutable fields (owner, houses,
+    mortgaged) from the owning Board's parallel arrays. Supports dict-style access
+    so existing callers can keep using space['owner'].
+    """
+    __slots__ = ("board", "id")
+
+    def __init__(self, board, space_id):
+        self.board = board
+        self.id = space_id
+
+    def __getitem__(self, key):
+        if key in _MUTABLE_FIELDS:
+            return getattr(self.board, key)[self.id]
+        return _STATIC_FIELDS[key][self.id]
+
+    def __setitem__(self, key, value):
+        if key not in _MUTABLE_FIELDS:
+            raise KeyError(f"'{key}' is static board data and cannot be changed.")
+        if key == "owner":
+            self.board.set_owner(self.id, value)
+        else:
+            getattr(self.board, key)[self.id] = value
+            self.board.changed(self.id)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return f"Space({self.id}, {SPACE_NAMES[self.id]})"
+
+class Board:
+    def __init__(self, num_players=4):
+        # Per-game mutable state: parallel arrays indexed by space id
+        self.owner = list(_EMPTY_OWNERS)
+        self.houses = list(_EMPTY_HOUSES)
+        self.mortgaged = list(_EMPTY_MORTGAGES)
+
+        # Ownership index, kept in sync by set_owner()
+        # owned_masks[p]: bit i set if player p owns space i
+        # group_counts[p][g]: how many spaces of color group g player p owns
+        self.owned_masks = [0] * num_players
+        self.group_counts = [[0] * len(GROUP_NAMES) for _ in range(num_players)]
+        self.taken_mask = 0  # Every space owned by any player
+
+        self.spaces = [Space(self, i) for i in range(40)]
+        # Define color groups for "Set Completer" logic
+        self.color_groups = COLOR_GROUPS
+
+        # Change listeners (e.g. the state encoder's incremental features).
+        # Called as listener(space_id) after a space changes; None = the whole board.
+        self.listeners = []
+
+    def reset(self, num_players=None):
+        """Clears ownership and building state in place for a new game."""
+        self.owner[:] = _EMPTY_OWNERS
+        self.houses[:] = _EMPTY_HOUSES
+        self.mortgaged[:] = _EMPTY_MORTGAGES
+        self.taken_mask = 0
+
+        if num_players is not None and num_players != len(self.owned_masks):
+            self.owned_masks = [0] * num_players
+            self.group_counts = [[0] * len(GROUP_NAMES) for _ in range(num_players)]
+        else:
+            self.owned_masks[:] = [0] * len(self.owned_masks)
+            for counts in self.group_counts:
+                counts[:] = [0] * len(GROUP_NAMES)
+        self.changed()
+
+    def set_owner(self, space_id, player_id):
+        """Transfers a space (None = Bank) and updates the ownership index."""
+        old_owner = self.owner[space_id]
+        if old_owner == player_id:
+            return
+        bit = 1 << space_id
+        group = SPACE_GROUP_INDEX[space_id]
+
+        if old_owner is not None:
+            self.owned_masks[old_owner] &= ~bit
+            if group >= 0:
+                self.group_counts[old_owner][group] -= 1
+        if player_id is not None:
+            self.owned_masks[player_id] |= bit
+            if group >= 0:
+                self.group_counts[player_id][group] += 1
+            self.taken_mask |= bit
+        else:
+            self.taken_mask &= ~bit
+
+        self.owner[space_id] = player_id
+        self.changed(space_id)
+
+    def changed(self, space_id=None):
+        """Notifies listeners that a space (None = every space) changed."""
+        for listener in self.listeners:
+            listener(space_id)
+
+    def has_monopoly(self, player_id, group):
+        """True if the player owns every space of the color group (by index)."""
+        return self.group_counts[player_id][group] == GROUP_SIZES[group]
+
+    def completes_monopoly(self, player_id, space_id):
+        """True if acquiring space_id would give the player the whole color group."""
+        group = SPACE_GROUP_INDEX[space_id]
+        if group < 0:
+            return False
+        return self.group_counts[player_id][group] == GROUP_SIZES[group] - 1
+
+    def find_missing_link(self, player_id):
+        """
+        Returns (group_index, space_id) for the first color group where the player
+        owns all but one space and that space belongs to an opponent, else None.
+        """
+        counts = self.group_counts[player_id]
+        mask = self.owned_masks[player_id]
+        for group, size in enumerate(GROUP_SIZES):
+            if counts[group] == size - 1:
+                missing = GROUP_MASKS[group] & ~mask & self.taken_mask
+                if missing:
+                    return group, missing.bit_length() - 1
+        return None
 
     def get_space(self, index):
         return self.spaces[index]
 
+class EngineSnapshot:
+    """
+    Frozen copy of a MonopolyEngine's game state (see MonopolyEngine.snapshot).
+    Board state is stored as flat list copies; the dice buffer is shared because the
+    engine only ever replaces it, never mutates it.
+    """
+    __slots__ = (
+        "owner", "houses", "mortgaged", "owned_masks", "group_counts", "taken_mask",
+        "players", "current_player_idx", "turn_count", "game_over", "winner", "end_reason", "game_id",
+        "rng_state", "dice_totals", "dice_doubles", "dice_cursor", "decks"
+    )
+
 class MonopolyEngine:
-    def __init__(self, num_players=4):
-        self.board = Board()
+    def __init__(self, num_players=4, seed=None, game_id=None, max_turns=None, decided_share=None):
+        """
+        seed / game_id: every engine owns its own NumPy Generator. A game is exactly
+        replayable from (seed, game_id); seed=None draws fresh entropy (kept in self.seed).
+        max_turns: optional turn cap; the richest solvent player wins when it is reached.
+        decided_share: optional early cutoff; checked once per round, the game ends when one
+            player holds at least this share (e.g. 0.8) of all solvent net worth.
+        """
+        self.max_turns = max_turns
+        self.decided_share = decided_share
+        self.seed = seed if seed is not None else np.random.SeedSequence().entropy
+        self.game_id = game_id
+        self.rng = make_rng(self.seed, game_id)
+        self._dice_totals = []
+        self._dice_doubles = []
+        self._dice_cursor = 0
+        # Decks are shuffled from the engine's generator (before any dice are drawn)
+        self.cards = CardManager(self.rng)
+
+        self.board = Board(num_players)
         self.players = [Player(i, f"Player {i}") for i in range(num_players)]
         self.current_player_idx = 0
         self.turn_count = 0
+        self.last_roll = 0
+        self.rent_modifier = MODIFIER_NONE
         self.game_over = False
+        self.winner = None
+        self.end_reason = None
 
-    def reset(self, num_players=4):
-        self.board = Board()
-        self.players = [Player(i, f"Player {i}") for i in range(num_players)]
+    def reset(self, num_players=4, game_id=None):
+        """
+        Resets board and players in place (no reallocation unless the seat count changes).
+        Passing game_id reseeds the engine so the new game is (seed, game_id)-replayable.
+        """
+        if game_id is not None:
+            self.game_id = game_id
+            self.rng = make_rng(self.seed, game_id)
+            self._dice_totals = []
+            self._dice_doubles = []
+            self._dice_cursor = 0
+        self.cards.reseed(self.rng)
+
+        self.board.reset(num_players)
+        if len(self.players) == num_players:
+            for player in self.players:
+                player.reset()
+        else:
+            self.players = [Player(i, f"Player {i}") for i in range(num_players)]
         self.current_player_idx = 0
         self.turn_count = 0
         self.game_over = False
+        self.winner = None
+        self.end_reason = None
 
     def roll_dice(self):
-        d1 = random.randint(1, 6)
-        d2 = random.randint(1, 6)
-        return d1 + d2, (d1 == d2)
+        # Rolls are drawn DICE_BLOCK at a time and consumed from plain lists
+        if self._dice_cursor >= len(self._dice_totals):
+            self._refill_dice()
+        i = self._dice_cursor
+        self._dice_cursor += 1
+        return self._dice_totals[i], self._dice_doubles[i]
+
+    def _refill_dice(self):
+        block = roll_block(self.rng, DICE_BLOCK)
+        self._dice_totals = (block[:, 0] + block[:, 1]).tolist()
+        self._dice_doubles = (block[:, 0] == block[:, 1]).tolist()
+        self._dice_cursor = 0
+
+    # --- SNAPSHOT / FORK ---
+    def snapshot(self):
+        """Captures board, players, turn index and RNG state without deep-copying."""
+        board = self.board
+        snap = EngineSnapshot()
+        snap.owner = board.owner[:]
+        snap.houses = board.houses[:]
+        snap.mortgaged = board.mortgaged[:]
+        snap.owned_masks = board.owned_masks[:]
+        snap.group_counts = [counts[:] for counts in board.group_counts]
+        snap.taken_mask = board.taken_mask
+        snap.players = [
+            (p.cash, p.position, p.in_jail, p.jail_turns, p.get_out_of_jail_card, p.bankrupt,
+             [s.id for s in p.properties])
+            for p in self.players
+        ]
+        snap.current_player_idx = self.current_player_idx
+        snap.turn_count = self.turn_count
+        snap.game_over = self.game_over
+        snap.winner = self.winner
+        snap.end_reason = self.end_reason
+        snap.game_id = self.game_id
+        snap.rng_state = self.rng.bit_generator.state
+        snap.dice_totals = self._dice_totals
+        snap.dice_doubles = self._dice_doubles
+        snap.dice_cursor = self._dice_cursor
+        # Deck order lists are replaced on shuffle, never mutated, so they can be shared
+        snap.decks = [(d.order, d.cursor, d.held) for d in (self.cards.chance, self.cards.community_chest)]
+        return snap
+
+    def restore(self, snap):
+        """Rewinds this engine to a snapshot taken from it (or from any engine)."""
+        board = self.board
+        board.owner[:] = snap.owner
+        board.houses[:] = snap.houses
+        board.mortgaged[:] = snap.mortgaged
+        board.owned_masks = snap.owned_masks[:]
+        board.group_counts = [counts[:] for counts in snap.group_counts]
+        board.taken_mask = snap.taken_mask
+        board.changed()
+
+        if len(self.players) != len(snap.players):
+            self.players = [Player(i, f"Player {i}") for i in range(len(snap.players))]
+        for player, (cash, position, in_jail, jail_turns, jail_card, bankrupt, props) in zip(self.players, snap.players):
+            player.cash = cash
+            player.position = position
+            player.in_jail = in_jail
+            player.jail_turns = jail_turns
+            player.get_out_of_jail_card = jail_card
+            player.bankrupt = bankrupt
+            player.properties = [board.spaces[i] for i in props]
+
+        self.current_player_idx = snap.current_player_idx
+        self.turn_count = snap.turn_count
+        self.game_over = snap.game_over
+        self.winner = snap.winner
+        self.end_reason = snap.end_reason
+        self.game_id = snap.game_id
+        self.rng.bit_generator.state = snap.rng_state
+        self._dice_totals = snap.dice_totals
+        self._dice_doubles = snap.dice_doubles
+        self._dice_cursor = snap.dice_cursor
+        for deck, (order, cursor, held) in zip((self.cards.chance, self.cards.community_chest), snap.decks):
+            deck.order, deck.cursor, deck.held = order, cursor, held
+
+    def fork(self, reseed=None):
+        """
+        Returns an independent engine in the same position (subclass attributes such as
+        a shared model are carried over by reference).
+        reseed: None replays the same future; any int gives the fork its own dice stream,
+        which is what rollouts ("buy vs pass" over many futures) want. Fork streams are
+        separate from every game stream, so a fork never replays a sibling game.
+        """
+        clone = copy.copy(self)
+        clone.board = Board(len(self.players))
+        clone.players = [Player(p.id, p.name, p.start_cash) for p in self.players]
+        clone.rng = make_rng(self.seed, self.game_id)
+        clone.cards = CardManager(clone.rng)
+        clone.restore(self.snapshot())
+
+        if reseed is not None:
+            clone.rng = make_fork_rng(self.seed, self.game_id, reseed)
+            clone._dice_totals = []
+            clone._dice_doubles = []
+            clone._dice_cursor = 0
+            clone.cards.chance.rng = clone.cards.community_chest.rng = clone.rng
+        return clone
 
     def run_turn(self):
         if self.game_over:
@@ -107,94 +404,233 @@ class MonopolyEngine:
 
         player = self.players[self.current_player_idx]
         
-        if player.cash <= 0:
+        if player.bankrupt:
             self._next_turn()
             return {"player": player.id, "event": "skip_bankrupt", "result": "bankrupt"}
 
         # 1. Roll & Move
         steps, double = self.roll_dice()
+        self.last_roll = steps
         
-        if player.in_jail:
+        if player.in_jail and self._use_jail_card(player):
+            pass
+        elif player.in_jail:
             if double:
                 player.in_jail = False
                 player.jail_turns = 0
             else:
                 player.jail_turns += 1
                 if player.jail_turns >= 3:
-                    player.pay(50)
                     player.in_jail = False
                     player.jail_turns = 0
+                    self._charge(player, 50)
+                    if player.bankrupt:
+                        self._next_turn()
+                        return {"player": player.id, "space": "Jail", "result": "bankrupt", "cash": player.cash}
                 else:
                     self._next_turn()
                     return {"player": player.id, "space": "Jail", "result": "jail_stay", "cash": player.cash}
 
         player.move(steps)
-        space = self.board.get_space(player.position)
         
         log = {
             "player": player.id,
             "position": player.position,
-            "space": space['name'],
+            "space": SPACE_NAMES[player.position],
             "cash": player.cash,
             "trade_event": False
         }
 
         # 2. Handle Space Event
-        if space['type'] == 'property' or space['type'] == 'railroad' or space['type'] == 'utility':
-            self._handle_property(player, space, log)
-        elif space['type'] == 'tax':
-            player.pay(space['rent'])
-            log['result'] = f"paid_tax_{space['rent']}"
-        elif space['name'] == "Go To Jail":
-            player.position = 10 
+        self._land(player, log)
+        if player.bankrupt:
+            log['result'] = "bankrupt"
+
+        self._next_turn()
+        return log
+
+    def _land(self, player, log, depth=0):
+        """Resolves the space the player is on. Cards may move them and land again."""
+        pos = player.position
+        space_type = SPACE_TYPES[pos]
+        log['position'] = pos
+        log['space'] = SPACE_NAMES[pos]
+
+        if space_type == 'property' or space_type == 'railroad' or space_type == 'utility':
+            self._handle_property(player, self.board.spaces[pos], log)
+        elif space_type == 'tax':
+            self._charge(player, SPACE_RENTS[pos])
+            log['result'] = f"paid_tax_{SPACE_RENTS[pos]}"
+        elif pos == 30:
+            player.position = JAIL_POSITION
             player.in_jail = True
             log['result'] = "sent_to_jail"
+        elif space_type == 'action' and depth <= MAX_CARD_CHAIN:
+            self._handle_card(player, log, depth)
         else:
             log['result'] = "landed_safe"
 
-        self._next_turn()
-        return log
+    def _handle_card(self, player, log, depth):
+        deck = self.cards.chance if SPACE_NAMES[player.position] == "Chance" else self.cards.community_chest
+        card = deck.draw(player.id)
+        action = deck.action[card]
+        value = deck.value[card]
+        log['card'] = deck.compiled.ids[card]
+        log['result'] = f"card_{log['card']}"
+
+        if action == CARD_MOVE_ABS:
+            self._advance_to(player, value)
+            self._land(player, log, depth + 1)
+        elif action == CARD_MOVE_REL:
+            player.position = (player.position + value) % 40
+            self._land(player, log, depth + 1)
+        elif action == CARD_MOVE_NEAREST:
+            targets = STATION_SPACES if value == NEAREST_STATION else UTILITY_SPACES
+            self._advance_to(player, nearest_space(player.position, targets))
+            self.rent_modifier = deck.extra[card]
+            self._land(player, log, depth + 1)
+            self.rent_modifier = MODIFIER_NONE
+        elif action == CARD_EARN:
+            player.receive(value)
+        elif action == CARD_PAY:
+            self._charge(player, value)
+        elif action == CARD_JAIL_FREE:
+            player.get_out_of_jail_card = True
+        elif action == CARD_GO_JAIL:
+            player.position = JAIL_POSITION
+            player.in_jail = True
+        elif action == CARD_REPAIRS:
+            houses = self.board.houses
+            hotels = sum(1 for p in player.properties if houses[p.id] == 5)
+            small = sum(houses[p.id] for p in player.properties if houses[p.id] < 5)
+            self._charge(player, small * value + hotels * deck.extra[card])
+        elif action == CARD_PAY_ALL:
+            for other in self.players:
+                if other is not player and not other.bankrupt:
+                    self._charge(player, value, other)
+                    if player.bankrupt:
+                        break
+        elif action == CARD_EARN_ALL:
+            for other in self.players:
+                if other is not player and not other.bankrupt:
+                    self._charge(other, value, player)
+
+    def _advance_to(self, player, target):
+        """Card movement forwards to a fixed space (collects GO when wrapping)."""
+        if target < player.position:
+            player.receive(200)
+        player.position = target
+
+    def _use_jail_card(self, player):
+        """Plays a held Get Out of Jail Free card (Chance first). Returns True if used."""
+        for deck in (self.cards.chance, self.cards.community_chest):
+            if deck.holds_jail_card(player.id):
+                deck.return_jail_card(player.id)
+                player.in_jail = False
+                player.jail_turns = 0
+                player.get_out_of_jail_card = (
+                    self.cards.chance.holds_jail_card(player.id)
+                    or self.cards.community_chest.holds_jail_card(player.id)
+                )
+                return True
+        return False
 
     def _handle_property(self, player, space, log):
-        if space['owner'] is None:
-            if player.cash > space['price']:
+        space_id = space.id
+        owner_id = self.board.owner[space_id]
+        if owner_id is None:
+            if player.cash > SPACE_PRICES[space_id]:
                 player.buy_property(space)
-                space['owner'] = player.id
+                self.board.set_owner(space_id, player.id)
                 log['result'] = "bought_property"
             else:
                 log['result'] = "pass_no_money"
-        elif space['owner'] != player.id:
-            rent = space['rent']
-            amount = player.pay(rent)
-            owner = self.players[space['owner']]
-            owner.receive(amount)
+        elif owner_id != player.id:
+            amount = self._charge(player, self._rent_due(space_id, owner_id), self.players[owner_id])
             log['result'] = f"paid_rent_{amount}"
         else:
             log['result'] = "already_owned"
 
+    # --- PAYMENTS & BANKRUPTCY ---
+    def _charge(self, player, amount, creditor=None):
+        """
+        Collects a payment to a creditor (None = Bank). A player who cannot pay in full
+        hands over all cash and goes bankrupt to the creditor. Returns the amount paid.
+        """
+        paid = player.pay(amount)
+        if creditor is not None:
+            creditor.receive(paid)
+        if paid < amount:
+            self._bankrupt(player, creditor)
+        return paid
+
+    def _bankrupt(self, player, creditor=None):
+        """Eliminates a player: assets go to the creditor, or back to the Bank."""
+        player.bankrupt = True
+        player.in_jail = False
+        player.jail_turns = 0
+        board = self.board
+        for prop in player.properties:
+            if creditor is None:
+                board.houses[prop.id] = 0
+                board.mortgaged[prop.id] = False
+                board.set_owner(prop.id, None)
+            else:
+                board.set_owner(prop.id, creditor.id)
+        if creditor is not None:
+            creditor.properties.extend(player.properties)
+        player.properties = []
+
+        # Held jail cards go back into their decks
+        self.cards.chance.return_jail_card(player.id)
+        self.cards.community_chest.return_jail_card(player.id)
+        player.get_out_of_jail_card = False
+
+        solvent = [p for p in self.players if not p.bankrupt]
+        if len(solvent) <= 1 and not self.game_over:
+            self._end_game(solvent[0].id if solvent else None, "last_player")
+
+    def _end_game(self, winner, reason):
+        self.game_over = True
+        self.winner = winner
+        self.end_reason = reason
+
+    def _richest(self):
+        """(id, share of total solvent net worth) for the wealthiest solvent player."""
+        worth = {p.id: p.get_net_worth(self.board) for p in self.players if not p.bankrupt}
+        leader = max(worth, key=worth.get)
+        total = sum(worth.values())
+        return leader, (worth[leader] / total if total > 0 else 1.0)
+
+    def _rent_due(self, space_id, owner_id):
+        """Rent owed on a space via the compiled tables (no dict walks)."""
+        board = self.board
+        if board.mortgaged[space_id]:
+            return 0
+        space_type = SPACE_TYPES[space_id]
+        if space_type == 'railroad':
+            rent = STATION_RENT[(board.owned_masks[owner_id] & STATION_MASK).bit_count()]
+            return rent * 2 if self.rent_modifier == MODIFIER_DOUBLE_RENT else rent
+        if space_type == 'utility':
+            if self.rent_modifier == MODIFIER_TEN_TIMES:
+                return 10 * self.last_roll
+            return UTILITY_MULTIPLIER[(board.owned_masks[owner_id] & UTILITY_MASK).bit_count()] * self.last_roll
+        group = SPACE_GROUP_INDEX[space_id]
+        complete = board.group_counts[owner_id][group] == GROUP_SIZES[group]
+        return RENT_TABLE[space_id][board.houses[space_id]][complete]
+
     def try_smart_trade(self, player_idx):
         """
         PRIORITY 3 & 4: Set Completer with Defensive Awareness.
         """
         player = self.players[player_idx]
         
-        # 1. Identify "Missing Links"
-        target_group = None
-        missing_id = None
+        # 1. Identify "Missing Links" (ownership index lookup, no board scan)
+        link = self.board.find_missing_link(player.id)
         
-        for group, ids in self.board.color_groups.items():
-            owned_count = sum(1 for i in ids if self.board.spaces[i]['owner'] == player.id)
-            if owned_count == len(ids) - 1:
-                # We are 1 away!
-                for i in ids:
-                    if self.board.spaces[i]['owner'] != player.id and self.board.spaces[i]['owner'] is not None:
-                        target_group = group
-                        missing_id = i
-                        break
-            if target_group: break
-        
-        if not target_group:
+        if link is None:
             return False, "no_strategic_targets"
+        target_group, missing_id = link
 
         # 2. Formulate Offer
         target_space = self.board.spaces[missing_id]
@@ -218,10 +654,9 @@ class MonopolyEngine:
         # We now pass 'player' (the buyer) so the seller knows who they are dealing with
         if self._accept_trade(target_owner, offer_price, target_space, player):
             # Execute
-            player.pay(offer_price)
-            target_owner.receive(offer_price)
+            self._charge(player, offer_price, target_owner)
             
-            target_space['owner'] = player.id
+            self.board.set_owner(missing_id, player.id)
             player.properties.append(target_space)
             target_owner.properties = [p for p in target_owner.properties if p['id'] != missing_id]
             
@@ -238,14 +673,8 @@ class MonopolyEngine:
         
         # 1. DETECT THREAT (Kingmaker Scenario)
         # Does this trade give the BUYER a monopoly?
-        group = property_at_stake['group']
-        group_ids = self.board.color_groups.get(group, [])
-        
-        # Count what the buyer ALREADY has
-        buyer_owns = sum(1 for i in group_ids if self.board.spaces[i]['owner'] == buyer.id)
-        
-        # If they have (Total - 1), this card is the final piece.
-        completes_monopoly = (buyer_owns == len(group_ids) - 1)
+        # If the buyer already has (Total - 1) of the group, this card is the final piece.
+        completes_monopoly = self.board.completes_monopoly(buyer.id, property_at_stake.id)
 
         # 2. DECISION LOGIC
         if completes_monopoly:
@@ -268,4 +697,14 @@ class MonopolyEngine:
 
     def _next_turn(self):
         self.current_player_idx = (self.current_player_idx + 1) % len(self.players)
-        self.turn_count += 1
\ No newline at end of file
+        self.turn_count += 1
+        if self.game_over:
+            return
+
+        # Early endings: turn cap, or (once per round) a decided game
+        if self.max_turns is not None and self.turn_count >= self.max_turns:
+            self._end_game(self._richest()[0], "turn_cap")
+        elif self.decided_share is not None and self.current_player_idx == 0:
+            leader, share = self._richest()
+            if share >= self.decided_share:
+                self._end_game(leader, "decided")
\ No newline at end of file
@@ -0,0 +1,34 @@
+import os
+
+# --- ATOMIC FILE WRITES ---
+# Every artifact (rules cache, converted models, exports, checkpoints, simulation parts)
+# is written under a temp name next to its target and renamed into place, so a reader or
+# a resumed run only ever sees the previous file or the complete new one.
+
+def atomic_write(path, write, fsync=False) -> bool:
+    """
+    Calls write(tmp_path) and renames the temp file to `path` when it returns.
+    If write returns False the temp file is discarded and `path` is left as it was.
+    On any error the temp file is removed and the error re-raised.
+    fsync=True syncs the file to disk before the rename. Returns True if `path` was written.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        if write(tmp_path) is False:
+            os.remove(tmp_path)
+            return False
+        if fsync:
+            fd = os.open(tmp_path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        os.replace(tmp_path, path)
+        return True
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
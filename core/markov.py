@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import numpy as np
+from .engine import (
+    JAIL_POSITION, MAX_CARD_CHAIN, SPACE_NAMES, STATION_SPACES, UTILITY_SPACES, nearest_space
+)
+
+# --- BOARD GEOMETRY USED BY THE CHAIN (taken from the engine so the two cannot drift) ---
+GO_TO_JAIL = SPACE_NAMES.index("Go To Jail")
+CHANCE_SPACES = tuple(i for i, name in enumerate(SPACE_NAMES) if name == "Chance")
+CHEST_SPACES = tuple(i for i, name in enumerate(SPACE_NAMES) if name == "Community Chest")
+
+# Results keyed by (ruleset, deck hash). Vectors are read-only and shared.
+_CACHE = {}
+
+def _roll_outcomes():
+    """The 36 equally likely rolls as (total, is_double, probability)."""
+    return [(d1 + d2, d1 == d2, 1 / 36) for d1 in range(1, 7) for d2 in range(1, 7)]
+
+def _load_deck(file_path):
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(base_path, file_path), 'rb') as f:
+        raw = f.read()
+    return json.loads(raw), hashlib.sha1(raw).hexdigest()
+
+def _card_destination(card, position):
+    """Where a card sends the player. None = stays put, 'jail' = sent to jail."""
+    action = card['action']
+    if action == 'move_abs':
+        return card['value']
+    if action == 'move_rel':
+        return (position + card['value']) % 40
+    if action == 'move_nearest':
+        return nearest_space(position, STATION_SPACES if card['value'] == 'station' else UTILITY_SPACES)
+    if action == 'go_jail':
+        return 'jail'
+    return None
+
+class _Chain:
+    """
+    Builds the transition matrix over 40 squares + `max_jail_turns` in-jail states, times
+    the Get Out of Jail Free cards the player holds (one flag per deck, so 4 copies with
+    cards). A held card is out of its deck and is played at the start of the next jail
+    turn, Chance first, as in MonopolyEngine._use_jail_card. Opponents are not modelled:
+    the player can always draw a card nobody else holds.
+    """
+
+    def __init__(self, chance, chest, max_jail_turns, use_cards):
+        self.chance = chance if use_cards else []
+        self.chest = chest if use_cards else []
+        self.max_jail_turns = max_jail_turns
+        self.base = 40 + max_jail_turns
+        self.holdings = 4 if use_cards else 1   # bit 0: Chance card held, bit 1: Chest card held
+        self.size = self.base * self.holdings
+        self._resolved = {}
+
+    def resolve(self, square, held, depth=0):
+        """Distribution over end-of-turn states after landing on `square` (cards applied)."""
+        key = (square, held, depth)
+        if key in self._resolved:
+            return self._resolved[key]
+
+        out = np.zeros(self.size)
+        if square == GO_TO_JAIL:
+            out[held * self.base + 40] = 1.0
+        else:
+            if square in CHANCE_SPACES:
+                deck, bit = self.chance, 1
+            elif square in CHEST_SPACES:
+                deck, bit = self.chest, 2
+            else:
+                deck, bit = [], 0
+            if held & bit:
+                # Our held card is out of the deck
+                deck = [card for card in deck if card['action'] != 'jail_free']
+            if not deck or depth > MAX_CARD_CHAIN:
+                out[held * self.base + square] = 1.0
+            else:
+                # Every card is equally likely to be on top of the deck
+                for card in deck:
+                    dest = _card_destination(card, square)
+                    if card['action'] == 'jail_free':
+                        out[(held | bit) * self.base + square] += 1 / len(deck)
+                    elif dest is None:
+                        out[held * self.base + square] += 1 / len(deck)
+                    elif dest == 'jail':
+                        out[held * self.base + 40] += 1 / len(deck)
+                    else:
+                        out += self.resolve(dest, held, depth + 1) / len(deck)
+
+        self._resolved[key] = out
+        return out
+
+    def matrix(self):
+        P = np.zeros((self.size, self.size))
+        rolls = _roll_outcomes()
+
+        for held in range(self.holdings):
+            offset = held * self.base
+
+            # Free squares: roll and move (the engine grants no extra turn on doubles)
+            for i in range(40):
+                if i == GO_TO_JAIL:
+                    P[offset + i, offset + 40] = 1.0
+                    continue
+                for total, _, prob in rolls:
+                    P[offset + i] += prob * self.resolve((i + total) % 40, held)
+
+            # In jail with a held card: play it (Chance first) and move with this turn's roll
+            if held:
+                used = held & ~(1 if held & 1 else 2)
+                for k in range(self.max_jail_turns):
+                    for total, _, prob in rolls:
+                        P[offset + 40 + k] += prob * self.resolve((JAIL_POSITION + total) % 40, used)
+                continue
+
+            # In jail after k failed attempts: doubles or the last attempt (fine paid) moves from Jail
+            for k in range(self.max_jail_turns):
+                state = offset + 40 + k
+                last_attempt = (k + 1 >= self.max_jail_turns)
+                for total, double, prob in rolls:
+                    if double or last_attempt:
+                        P[state] += prob * self.resolve((JAIL_POSITION + total) % 40, held)
+                    else:
+                        P[state, state + 1] += prob
+        return P
+
+def stationary_distribution(P):
+    """Solves pi = pi P with sum(pi) = 1 via a least-squares linear system."""
+    n = P.shape[0]
+    A = np.vstack([P.T - np.eye(n), np.ones(n)])
+    b = np.zeros(n + 1)
+    b[-1] = 1.0
+    pi, *_ = np.linalg.lstsq(A, b, rcond=None)
+    pi = np.clip(pi, 0.0, None)
+    return pi / pi.sum()
+
+def landing_distribution(chance_file: str = "data/chance_deck.json",
+                         chest_file: str = "data/comm_chest.json",
+                         max_jail_turns: int = 3,
+                         use_cards: bool = True) -> np.ndarray:
+    """
+    Long-run probability of ending a turn on each of the 40 squares.
+    Built from the dice distribution, the engine's jail rules (including held Get Out of
+    Jail Free cards) and the movement cards in the decks; time spent in jail is folded
+    into square 10.
+    Cached per (ruleset, deck contents), so repeat calls are free.
+    """
+    chance, chance_hash = _load_deck(chance_file)
+    chest, chest_hash = _load_deck(chest_file)
+    key = (max_jail_turns, use_cards, MAX_CARD_CHAIN, chance_hash, chest_hash)
+    if key in _CACHE:
+        return _CACHE[key]
+
+    chain = _Chain(chance, chest, max_jail_turns, use_cards)
+    pi = stationary_distribution(chain.matrix())
+
+    # Fold the held-card copies together, then time in jail into square 10
+    pi = pi.reshape(chain.holdings, chain.base).sum(axis=0)
+    landing = pi[:40].copy()
+    landing[JAIL_POSITION] += pi[40:].sum()
+    landing.setflags(write=False)
+    _CACHE[key] = landing
+    return landing
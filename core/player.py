@@ -1,3 +1,10 @@
+from .rules import load_rules
+
+# Valuation tables from the compiled ruleset (space id -> value)
+_RULES = load_rules()
+_PRICES = _RULES.price.tolist()
+_HOUSE_COSTS = _RULES.house_cost.tolist()
+
 class Player:
     def __init__(self, player_id, name, start_cash=1500):
         self.id = player_id
@@ -8,6 +15,18 @@ class Player:
         self.in_jail = False
         self.jail_turns = 0
         self.get_out_of_jail_card = False
+        self.bankrupt = False
+        self.start_cash = start_cash
+
+    def reset(self):
+        """Restores the starting position in place for a new game."""
+        self.cash = self.start_cash
+        self.position = 0
+        self.properties.clear()
+        self.in_jail = False
+        self.jail_turns = 0
+        self.get_out_of_jail_card = False
+        self.bankrupt = False
 
     def pay(self, amount):
         """Standard payment logic. Returns amount paid (or max available)."""
@@ -15,8 +34,7 @@ class Player:
             self.cash -= amount
             return amount
         else:
-            # Bankrupt/Debt logic would go here. 
-            # For now, we drain them to 0.
+            # Drain them to 0; the engine decides whether this is a bankruptcy.
             paid = self.cash
             self.cash = 0
             return paid
@@ -44,12 +62,10 @@ class Player:
         Precise Net Worth: Cash + Property Value + House Values.
         Requires board access to check house counts.
         """
+        houses = board.houses
         asset_value = 0
         for prop in self.properties:
-            asset_value += prop['price']
-            # If we had houses logic, we would query the board here:
-            # houses = board.spaces[prop['id']].get('houses', 0)
-            # asset_value += houses * prop['house_cost']
+            asset_value += _PRICES[prop.id] + houses[prop.id] * _HOUSE_COSTS[prop.id]
         return self.cash + asset_value
 
     def get_net_worth_raw(self):
@@ -57,7 +73,7 @@ class Player:
         Fast Net Worth for the AI Encoder.
         Does not require board access (ignores House values for speed).
         """
-        asset_value = sum(p['price'] for p in self.properties)
+        asset_value = sum(_PRICES[p.id] for p in self.properties)
         return self.cash + asset_value
 
     def __repr__(self):
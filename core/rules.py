@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import numpy as np
+from .io import atomic_write
+
+# --- COMPILED RULESET ---
+# data/london_properties.json is turned into flat NumPy lookup tables once, cached on
+# disk as an .npz keyed by the JSON's hash, and shared by every engine in the process.
+
+MAX_HOUSES = 5  # 5 houses = 1 hotel
+STATION_GROUP = "Station"
+UTILITY_GROUP = "Utility"
+
+_LOADED = {}
+
+def _project_path(path):
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, path)
+
+class CompiledRules:
+    """
+    Per-space lookup tables (all indexed by board position 0-39).
+        price[40], mortgage[40], house_cost[40]
+        rent[40, 6, 2]        rent by (space, houses, group complete)
+        station_rent[5]       rent by number of stations the owner holds
+        utility_multiplier[3] dice multiplier by number of utilities the owner holds
+        group[40]             color group index (-1 for stations, utilities, specials)
+        names[40], group_names[G]
+    """
+    FIELDS = ("price", "mortgage", "house_cost", "rent", "station_rent",
+              "utility_multiplier", "group", "names", "group_names")
+
+    def __init__(self, **tables):
+        for field in self.FIELDS:
+            setattr(self, field, tables[field])
+
+    @property
+    def color_groups(self):
+        """{group name: [space ids]} in board order."""
+        return {
+            str(name): np.flatnonzero(self.group == g).tolist()
+            for g, name in enumerate(self.group_names)
+        }
+
+def compile_rules(properties: list) -> CompiledRules:
+    """Turns the raw property list into lookup tables."""
+    price = np.zeros(40, dtype=np.int64)
+    mortgage = np.zeros(40, dtype=np.int64)
+    house_cost = np.zeros(40, dtype=np.int64)
+    rent = np.zeros((40, MAX_HOUSES + 1, 2), dtype=np.int64)
+    group = np.full(40, -1, dtype=np.int64)
+    names = [""] * 40
+    group_names = []
+    station_rent = np.zeros(5, dtype=np.int64)
+
+    for prop in sorted(properties, key=lambda p: p['index']):
+        i = prop['index']
+        names[i] = prop['name']
+        price[i] = prop['price']
+        mortgage[i] = prop.get('mortgage', prop['price'] // 2)
+        house_cost[i] = prop.get('house_cost', 0)
+
+        if prop['group'] == STATION_GROUP:
+            # Ladder is per number of stations owned: 1, 2, 3, 4
+            station_rent[1:1 + len(prop['rent'])] = prop['rent']
+        elif prop['group'] != UTILITY_GROUP:
+            if prop['group'] not in group_names:
+                group_names.append(prop['group'])
+            group[i] = group_names.index(prop['group'])
+            ladder = prop['rent']
+            rent[i, :len(ladder), 0] = ladder
+            rent[i, :len(ladder), 1] = ladder
+            # Unimproved streets in a completed set charge double rent
+            rent[i, 0, 1] = ladder[0] * 2
+
+    return CompiledRules(
+        price=price, mortgage=mortgage, house_cost=house_cost, rent=rent,
+        station_rent=station_rent,
+        utility_multiplier=np.array([0, 4, 10], dtype=np.int64),
+        group=group, names=np.array(names), group_names=np.array(group_names)
+    )
+
+def load_rules(property_file: str = "data/london_properties.json",
+               cache_dir: str = "data/cache") -> CompiledRules:
+    """
+    Returns the compiled ruleset, building it at most once per JSON version.
+    The .npz artifact is written atomically so concurrent workers can share it.
+    """
+    with open(_project_path(property_file), 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha1(raw).hexdigest()[:16]
+    if digest in _LOADED:
+        return _LOADED[digest]
+
+    cache_path = _project_path(os.path.join(cache_dir, f"rules_{digest}.npz"))
+    rules = None
+    if os.path.exists(cache_path):
+        try:
+            with np.load(cache_path) as data:
+                rules = CompiledRules(**{field: data[field] for field in CompiledRules.FIELDS})
+        except (OSError, KeyError, ValueError):
+            rules = None  # Stale or truncated artifact: rebuild below
+
+    if rules is None:
+        rules = compile_rules(json.loads(raw))
+        # The cache is best-effort: on a read-only checkout the compiled rules are used from memory
+        def write(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **{field: getattr(rules, field) for field in CompiledRules.FIELDS})
+        try:
+            atomic_write(cache_path, write)
+        except OSError:
+            pass
+
+    _LOADED[digest] = rules
+    return rules
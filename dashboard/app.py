@@ -2,14 +2,13 @@ import sys
 import os
 import streamlit as st
 import pandas as pd
-import torch
 
 # --- PATH FIX ---
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from core.engine import MonopolyEngine
 from core.player import Player
-from ai.rl_agent import Agent
+from ai.registry import ModelRegistry
 from ai.state_encoder import StateEncoder
 
 # --- PAGE CONFIG ---
@@ -45,9 +44,8 @@ class DashboardEngine(MonopolyEngine):
             else:
                 log['result'] = "pass_choice" if can_afford else "pass_no_money"
         elif space['owner'] != player.id:
-            rent = space['rent']
-            amount = player.pay(rent)
-            self.players[space['owner']].receive(amount)
+            rent = self._rent_due(space.id, space['owner'])
+            amount = self._charge(player, rent, self.players[space['owner']])
             log['result'] = f"paid_rent_{amount}"
         else:
             log['result'] = "already_owned"
@@ -59,25 +57,16 @@ if 'engine' not in st.session_state:
     st.session_state.turn_count = 0
     st.session_state.ai_stats = {"decisions": [], "net_worth": []}
 
-    device = torch.device("cpu")
-    agent = Agent(state_size=176, action_size=3, device=device)
-    
-    model_path = os.path.join(os.path.dirname(__file__), '../models/monopoly_ai_trading.pth')
-    if os.path.exists(model_path):
-        try:
-            agent.model.load_state_dict(torch.load(model_path, map_location=device))
-            st.session_state.agent = agent
-        except Exception as e:
-            st.error(f"Model load failed: {e}")
-    else:
-        st.session_state.agent = agent
-
     st.session_state.encoder = StateEncoder()
 
+# One registry per server process: models are loaded on first use and shared by all sessions
+@st.cache_resource
+def get_registry():
+    return ModelRegistry(os.path.join(os.path.dirname(__file__), '../models'))
+
 # --- LOGIC ---
 def run_turn():
     engine = st.session_state.engine
-    agent = st.session_state.agent
     encoder = st.session_state.encoder
     
     current_player = engine.players[engine.current_player_idx]
@@ -85,10 +74,13 @@ def run_turn():
     
     # AI Decision
     if current_player.id == 0:
-        action = agent.act(state)
-        with torch.no_grad():
-            state_t = torch.FloatTensor(state).unsqueeze(0).to(agent.device)
-            q_values = agent.model(state_t).cpu().numpy()[0]
+        try:
+            expert = get_registry().get(st.session_state.model_name)
+            q_values = expert.q_values(expert.as_batch(state))[0]
+        except (KeyError, ValueError) as e:
+            st.error(f"Model '{st.session_state.model_name}' can't play: {e}")
+            return
+        action = int(q_values.argmax())
         st.session_state.last_q_values = q_values
         st.session_state.last_action = action
     else:
@@ -117,6 +109,9 @@ def run_turn():
 # --- SIDEBAR ---
 with st.sidebar:
     st.title("🎮 Controls")
+    registry = get_registry()
+    st.selectbox("Model", registry.names(), key="model_name",
+                 index=registry.names().index(registry.default) if registry.default in registry.names() else 0)
     if st.button("Run Turn", type="primary", use_container_width=True):
         run_turn()
     if st.button("Reset Game", use_container_width=True):
@@ -164,7 +159,7 @@ with col_brain:
     # Decision Chart
     if hasattr(st.session_state, 'last_q_values'):
         q = st.session_state.last_q_values
-        actions = ["Pass", "Buy", "Trade"]
+        actions = ["Pass", "Buy", "Trade"][:len(q)]
         
         # Safe Action Display
         chosen_idx = st.session_state.get('last_action')
@@ -1,26 +1,47 @@
-import csv
 import os
+import queue
+import threading
 from typing import List, Dict, Any
+from simulation.writers import LOGGER_SCHEMA, open_writer
 
 class SimulationLogger:
-    def __init__(self, filename: str = "sim_data_001.csv", buffer_size: int = 10000):
+    def __init__(self, filename: str = "sim_data_001.csv", buffer_size: int = 10000, fmt: str = None,
+                 background: bool = False, max_pending: int = 1):
         # Define output path
         self.output_dir = os.path.join("data", "raw_simulations")
         os.makedirs(self.output_dir, exist_ok=True)
         self.filepath = os.path.join(self.output_dir, filename)
-        
+
         self.buffer: List[Dict] = []
         self.buffer_size = buffer_size
-        
+        self.fmt = fmt  # None = from the filename extension (.csv / .parquet)
+        self.writer = None
+
         # specific columns we want to track for ML training
         self.fieldnames = [
             "game_id", "turn_number", "player_id", "total_players", # <--- Added total_players
             "position", "cash", "bank_cash", # <--- Added bank_cash
-            "net_worth", "properties_owned", 
-            "in_jail", "action_taken", 
-            "result_outcome", "game_winner" 
+            "net_worth", "properties_owned",
+            "in_jail", "action_taken",
+            "result_outcome", "game_winner"
         ]
 
+        # --- BACKGROUND MODE ---
+        # The game thread fills one buffer while a writer thread formats and writes the other.
+        # Buffers cycle through two queues: `filled` (to the writer) and `free` (back to the
+        # producer). With max_pending + 1 buffers in total, a slow disk makes log_turn wait
+        # for a free buffer instead of growing memory without bound.
+        self.background = background
+        self.error = None
+        self.thread = None
+        if background:
+            self.filled = queue.Queue(maxsize=max_pending)
+            self.free = queue.Queue()
+            for _ in range(max_pending):
+                self.free.put([])
+            self.thread = threading.Thread(target=self._writer_loop, name="SimulationLogger", daemon=True)
+            self.thread.start()
+
     def log_turn(self, game_id: int, turn_num: int, total_players: int, player_obj, action: str, result: str, bank_cash: int):
         """
         Staging area: Validates data and adds to temporary memory.
@@ -34,34 +55,72 @@ class SimulationLogger:
             "cash": player_obj.cash,
             "bank_cash": bank_cash,         # <--- Capture the new argument
             "net_worth": player_obj.cash,   # Placeholder for full net worth calc
-            "properties_owned": len(player_obj.properties), 
+            "properties_owned": len(player_obj.properties),
             "in_jail": 1 if player_obj.in_jail else 0,
             "action_taken": action,
             "result_outcome": result,
             "game_winner": None # Placeholder until game ends
         }
         self.buffer.append(row)
-        
+
         if len(self.buffer) >= self.buffer_size:
             self.flush()
 
     def flush(self):
-        """Writes the buffer to disk."""
+        """Writes the buffer to disk (or hands it to the writer thread in background mode)."""
         if not self.buffer:
             return
 
-        file_exists = os.path.isfile(self.filepath)
-        
-        with open(self.filepath, mode='a', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=self.fieldnames)
-            
-            if not file_exists:
-                writer.writeheader()
-                
-            writer.writerows(self.buffer)
-        
+        if self.background:
+            self._raise_writer_error()
+            # Swap: the full buffer goes to the writer, a drained one comes back
+            self.filled.put(self.buffer)
+            self.buffer = self.free.get()
+            return
+
+        self._write(self.buffer)
         self.buffer.clear()
 
+    def _write(self, rows):
+        if self.writer is None:
+            # CSV keeps appending to an existing log; Parquet starts a new file per logger
+            self.writer = open_writer(self.filepath, LOGGER_SCHEMA, fmt=self.fmt, append=True)
+
+        fieldnames = self.fieldnames
+        self.writer.write_rows([[row[f] for f in fieldnames] for row in rows])
+        self.writer.flush()
+
+    def _writer_loop(self):
+        """Writer thread: drains filled buffers until it receives None."""
+        while True:
+            rows = self.filled.get()
+            if rows is None:
+                return
+            if self.error is None:
+                try:
+                    self._write(rows)
+                except Exception as e:
+                    self.error = e  # Re-raised on the game thread at the next flush
+            rows.clear()
+            self.free.put(rows)
+
+    def _raise_writer_error(self):
+        if self.error is not None:
+            raise RuntimeError(f"SimulationLogger writer failed: {self.error}") from self.error
+
     def finalize(self):
-        """Force write remaining data at end of simulation."""
-        self.flush()
\ No newline at end of file
+        """Force write remaining data at end of simulation, then sync the file to disk."""
+        if self.background and self.thread is not None:
+            if self.buffer:
+                self.filled.put(self.buffer)
+                self.buffer = []
+            self.filled.put(None)
+            self.thread.join()
+            self.thread = None
+            self._raise_writer_error()
+        else:
+            self.flush()
+
+        if self.writer is not None:
+            self.writer.close(sync=True)
+            self.writer = None
@@ -1,123 +1,243 @@
-import csv
+import hashlib
+import json
 import os
 import torch
-import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from core.engine import MonopolyEngine
-from ai.state_encoder import StateEncoder
-from ai.rl_agent import MonopolyNet
+from core.io import atomic_write
+from ai.state_encoder import STATE_SIZE, StateEncoder
+from ai.broker import InferenceBroker
+from ai.registry import ModelRegistry
+from simulation.writers import RUNNER_SCHEMA, concat_files, detect_format, open_writer
 
 # --- CONFIGURATION ---
 NUM_GAMES = 500
-MODEL_PATH = "models/monopoly_ai_trading.pth"
-OUTPUT_FILE = "data/monopoly_smart_data.csv"
+MODELS_DIR = "models"
+MODEL_NAME = "monopoly_ai_trading"  # Any name from ModelRegistry(MODELS_DIR).names()
+MODEL_BACKEND = "torch"             # Backend for .pth checkpoints ("torch" or "numpy")
+OUTPUT_FILE = "data/monopoly_smart_data.parquet"  # .parquet (columnar) or .csv
+MAX_TURNS = 1000        # Hard cap so unattended runs always finish
+DECIDED_SHARE = 0.8     # End early once a player holds 80% of all net worth (None = off)
+
+# --- SHARDING ---
+WORKERS = os.cpu_count() or 1   # Processes in the pool (1 = run shards in-process)
+SHARD_SIZE = 50                 # Games per shard / output part
+SEED = 2024                     # Game g is always replayable from (SEED, g)
+PARTS_DIR = "data/parts"
+BATCH_GAMES = 256               # Games in flight per worker, sharing each forward pass (capped by SHARD_SIZE)
 
 class SmartSimulationEngine(MonopolyEngine):
-    def __init__(self, model, encoder, device):
-        super().__init__(num_players=4)
-        self.model = model
-        self.encoder = encoder
-        self.device = device
-
-    def get_ai_action(self, player):
-        state = self.encoder.encode(player, self.players, self.board.spaces)
-        state_tensor = torch.FloatTensor(state).unsqueeze(0).to(self.device)
-        with torch.no_grad():
-            q_values = self.model(state_tensor)
-        return torch.argmax(q_values).item()
+    """
+    Every seat is played by the policy. The action for the coming turn is set before
+    run_turn (0=Pass, 1=Buy, 2=Trade), the same contract as the training engine.
+    """
+    def __init__(self, seed=None):
+        super().__init__(num_players=4, seed=seed, max_turns=MAX_TURNS, decided_share=DECIDED_SHARE)
+        self.ai_decision = 0
+
+    def set_ai_decision(self, action):
+        self.ai_decision = action
 
     def _ai_decision_trade(self, player) -> bool:
-        action = self.get_ai_action(player)
-        return (action == 2)
+        return (self.ai_decision == 2)
 
     def _ai_decision_buy(self, player, space) -> bool:
-        action = self.get_ai_action(player)
-        return (action == 1)
-
-def run_simulation():
-    print(f"--- Starting Smart Simulation ({NUM_GAMES} Games) ---")
-    
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    print(f"Using Device: {device}")
-    
-    model = MonopolyNet(input_size=205, output_size=3).to(device)
-    if os.path.exists(MODEL_PATH):
-        model.load_state_dict(torch.load(MODEL_PATH, map_location=device))
-        model.eval()
-        print(f"Loaded Model: {MODEL_PATH}")
+        # Trading also buys (don't miss assets while trading)
+        return (self.ai_decision == 1) or (self.ai_decision == 2)
+
+    def _handle_property(self, player, space, log):
+        if space['owner'] is None and player.cash > space['price'] and not self._ai_decision_buy(player, space):
+            log['result'] = "pass_choice"
+            return
+        super()._handle_property(player, space, log)
+
+def play_game(game_id, seed=SEED):
+    """
+    Coroutine for one game (seeded from game_id). Yields the state to encode before
+    each turn, is resumed with the action, and returns the game's labelled rows.
+    Driven by an InferenceBroker so many games share each encode and forward pass.
+    """
+    engine = SmartSimulationEngine(seed=seed)
+    engine.reset(num_players=4, game_id=game_id)
+    game_history = []
+
+    while not engine.game_over:
+        current_player = engine.players[engine.current_player_idx]
+
+        # Ask the model (the game is suspended here until the batch is answered)
+        action = 0
+        if not current_player.bankrupt:
+            action = yield (current_player, engine.players, engine.board.spaces)
+        engine.set_ai_decision(action)
+
+        # Run turn
+        log = engine.run_turn()
+
+        # Skip turns that are just administrative (game over signals, etc)
+        if log.get("event") == "game_over":
+            break
+
+        if engine._ai_decision_trade(current_player) and not engine.game_over and not current_player.bankrupt:
+            success, msg = engine.try_smart_trade(current_player.id)
+            log['trade_event'] = True
+            if success:
+                log['result'] = msg
+
+        # --- FIX: ROBUST DECISION LABELING ---
+        decision_label = "PASS"
+        result_str = log.get("result", "") # Default to empty if missing
+        event_str = log.get("event", "")
+
+        if log.get("trade_event"):
+            decision_label = "TRADE_ATTEMPT"
+        elif "bought" in result_str:
+            decision_label = "BUY"
+        elif "paid" in result_str:
+            decision_label = "PAY_RENT"
+        elif "jail" in event_str:
+            decision_label = "JAIL_EVENT"
+            result_str = event_str # Use the event name as the result
+
+        # --- SAFELY EXTRACT FIELDS ---
+        # Some events (like Jail) might not have 'space' or 'cash' in the log
+        # We fetch them from the player object directly to be safe
+        pos = current_player.position
+        space_name = engine.board.get_space(pos)['name']
+        cash = current_player.cash
+
+        game_history.append([
+            game_id, engine.turn_count, log.get('player', current_player.id),
+            pos, space_name, cash,
+            current_player.get_net_worth(engine.board),
+            len(current_player.properties), current_player.in_jail,
+            decision_label, result_str, "TBD"
+        ])
+
+    # Backfill Winner (set by the engine: last solvent player, turn cap or decided game)
+    winner_id = engine.winner
+    if winner_id is None:
+        winner_id = max(engine.players, key=lambda p: p.get_net_worth(engine.board)).id
+    for row in game_history:
+        row[-1] = "WINNER" if row[2] == winner_id else "LOSER"
+    return game_history
+
+# --- WORKER PROCESS ---
+# Each worker loads the model and encoder once, then plays any number of shards.
+# Up to BATCH_GAMES games of a shard are in flight at once, sharing each forward pass.
+_worker = {}
+
+def _init_worker(seed, batch_games=BATCH_GAMES):
+    torch.set_num_threads(1)  # One core per worker; parallelism comes from the pool
+    _worker['seed'] = seed
+    encoder = StateEncoder()
+    expert = ModelRegistry(MODELS_DIR, backend=MODEL_BACKEND).get(MODEL_NAME)
+    _worker['broker'] = InferenceBroker(expert.q_values, max_batch=batch_games,
+                                        encode=encoder.encode_batch)
+
+def part_path(parts_dir, first_game, last_game, fmt):
+    return os.path.join(parts_dir, f"part-g{first_game:08d}-g{last_game:08d}.{fmt}")
+
+def _run_shard(first_game, last_game, parts_dir, fmt):
+    """
+    Plays games [first_game, last_game] into their own part file.
+    The part is written to a temp name and renamed when complete, so an existing part
+    is always a finished shard and a crashed run resumes without redoing it.
+    """
+    row_count = 0
+
+    def write(tmp_path):
+        nonlocal row_count
+        games = (play_game(g, _worker['seed']) for g in range(first_game, last_game + 1))
+        writer = open_writer(tmp_path, RUNNER_SCHEMA, fmt=fmt)
+        for rows in _worker['broker'].run(games):
+            writer.write_rows(rows)
+            row_count += len(rows)
+        writer.close()
+
+    atomic_write(part_path(parts_dir, first_game, last_game, fmt), write)
+    return first_game, row_count
+
+def merge_parts(parts, output_file):
+    """Concatenates finished parts in game-id order into output_file."""
+    atomic_write(output_file, lambda tmp_path: concat_files(
+        parts, tmp_path, RUNNER_SCHEMA, fmt=detect_format(output_file)))
+
+def run_config(model_path, seed) -> dict:
+    """Everything a finished part depends on (besides its game ids)."""
+    stat = os.stat(model_path)
+    return {
+        "model_path": os.path.abspath(model_path), "model_mtime_ns": stat.st_mtime_ns,
+        "model_size": stat.st_size, "backend": MODEL_BACKEND, "seed": seed,
+        "max_turns": MAX_TURNS, "decided_share": DECIDED_SHARE, "batch_games": BATCH_GAMES
+    }
+
+def config_fingerprint(config) -> str:
+    return hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()[:12]
+
+def run_simulation(num_games=NUM_GAMES, workers=WORKERS, shard_size=SHARD_SIZE, seed=SEED,
+                   output_file=OUTPUT_FILE):
+    fmt = detect_format(output_file)
+    print(f"--- Starting Smart Simulation ({num_games} Games, {workers} Workers, {fmt}) ---")
+
+    registry = ModelRegistry(MODELS_DIR, backend=MODEL_BACKEND)
+    if MODEL_NAME not in registry.names():
+        print(f"❌ ERROR: Model '{MODEL_NAME}' not found in {MODELS_DIR}/!")
+        return
+    print(f"Using Model: {registry.sources[MODEL_NAME]}")
+
+    # Parts live in a directory per (output, seed, config fingerprint): changing the model
+    # or any setting that changes the rows starts a new set of parts instead of reusing them
+    config = run_config(registry.sources[MODEL_NAME], seed)
+    stem = os.path.splitext(os.path.basename(output_file))[0]
+    parts_dir = os.path.join(PARTS_DIR, f"{stem}_seed{seed}_{config_fingerprint(config)}")
+    os.makedirs(parts_dir, exist_ok=True)
+    manifest = os.path.join(parts_dir, "manifest.json")
+    if not os.path.exists(manifest):
+        with open(manifest, 'w') as f:
+            json.dump(config, f, indent=2)
+
+    shards = [(first, min(first + shard_size - 1, num_games)) for first in range(1, num_games + 1, shard_size)]
+    todo = [s for s in shards if not os.path.exists(part_path(parts_dir, *s, fmt))]
+    if len(todo) < len(shards):
+        print(f"Resuming: {len(shards) - len(todo)}/{len(shards)} shards already complete")
+
+    if todo:
+        # Checked once here rather than failing in every worker
+        try:
+            input_size = registry.get(MODEL_NAME).input_size
+        except Exception as e:
+            print(f"❌ ERROR: Model '{MODEL_NAME}' failed to load: {e}")
+            return
+        if input_size != STATE_SIZE:
+            print(f"❌ ERROR: Model '{MODEL_NAME}' expects {input_size} features, the encoder makes {STATE_SIZE}!")
+            return
+
+    failed = []
+    if not todo:
+        pass  # Everything is on disk: no workers, no model loads
+    elif workers <= 1:
+        _init_worker(seed)
+        for first, last in todo:
+            _, rows = _run_shard(first, last, parts_dir, fmt)
+            print(f"Simulated Games {first}-{last} - Rows Generated: {rows}")
     else:
-        print("❌ ERROR: Model not found!")
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(seed,)) as pool:
+            futures = {pool.submit(_run_shard, first, last, parts_dir, fmt): (first, last) for first, last in todo}
+            for future in as_completed(futures):
+                first, last = futures[future]
+                try:
+                    _, rows = future.result()
+                    print(f"Simulated Games {first}-{last} - Rows Generated: {rows}")
+                except Exception as e:
+                    failed.append((first, last))
+                    print(f"❌ Shard {first}-{last} failed: {e}")
+
+    if failed:
+        print(f"--- {len(failed)} shard(s) failed. Re-run to resume; finished shards are kept. ---")
         return
 
-    encoder = StateEncoder()
-    engine = SmartSimulationEngine(model, encoder, device)
-    
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    
-    with open(OUTPUT_FILE, mode='w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow([
-            "game_id", "turn_id", "player_id", "position", "space_name",
-            "cash", "net_worth", "properties_owned", "in_jail", 
-            "decision", "result", "victory_status"
-        ])
-        
-        row_count = 0
-        
-        for g in range(1, NUM_GAMES + 1):
-            engine.reset(num_players=4)
-            game_history = []
-            
-            while not engine.game_over:
-                current_player = engine.players[engine.current_player_idx]
-                
-                # Run turn
-                log = engine.run_turn()
-                
-                # Skip turns that are just administrative (game over signals, etc)
-                if log.get("event") == "game_over":
-                    break
-
-                # --- FIX: ROBUST DECISION LABELING ---
-                decision_label = "PASS"
-                result_str = log.get("result", "") # Default to empty if missing
-                event_str = log.get("event", "")
-
-                if log.get("trade_event"):
-                    decision_label = "TRADE_ATTEMPT"
-                elif "bought" in result_str:
-                    decision_label = "BUY"
-                elif "paid" in result_str:
-                    decision_label = "PAY_RENT"
-                elif "jail" in event_str:
-                    decision_label = "JAIL_EVENT"
-                    result_str = event_str # Use the event name as the result
-                
-                # --- SAFELY EXTRACT FIELDS ---
-                # Some events (like Jail) might not have 'space' or 'cash' in the log
-                # We fetch them from the player object directly to be safe
-                pos = current_player.position
-                space_name = engine.board.get_space(pos)['name']
-                cash = current_player.cash
-                
-                game_history.append([
-                    g, engine.turn_count, log.get('player', current_player.id), 
-                    pos, space_name, cash, 
-                    current_player.get_net_worth(engine.board),
-                    len(current_player.properties), current_player.in_jail,
-                    decision_label, result_str, "TBD"
-                ])
-                
-            # Backfill Winner
-            winner = max(engine.players, key=lambda p: p.get_net_worth(engine.board))
-            for row in game_history:
-                row[-1] = "WINNER" if row[2] == winner.id else "LOSER"
-                writer.writerow(row)
-                row_count += 1
-            
-            if g % 50 == 0:
-                print(f"Simulated Game {g}/{NUM_GAMES} - Rows Generated: {row_count}")
-
-    print(f"--- Simulation Complete. Data saved to {OUTPUT_FILE} ---")
+    merge_parts([part_path(parts_dir, *s, fmt) for s in shards], output_file)
+    print(f"--- Simulation Complete. Data saved to {output_file} ---")
 
 if __name__ == "__main__":
-    run_simulation()
\ No newline at end of file
+    run_simulation()
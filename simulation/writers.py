@@ -0,0 +1,185 @@
+import csv
+import os
+
+# --- ROW WRITER BACKENDS ---
+# Simulation output goes through a RowWriter so a run can choose plain CSV or columnar
+# Parquet. The format is picked from the file extension (or passed explicitly).
+# pyarrow is only imported when Parquet is actually used.
+
+# Column kinds -> Arrow types. Strings are dictionary-encoded in the Parquet file.
+_ARROW_TYPES = {
+    "int8": "int8", "int16": "int16", "int32": "int32", "int64": "int64",
+    "bool": "bool_", "string": "string"
+}
+
+# --- SCHEMAS ---
+# (column, kind) pairs. The column order is the row order the producers emit.
+RUNNER_SCHEMA = [
+    ("game_id", "int32"), ("turn_id", "int32"), ("player_id", "int8"),
+    ("position", "int8"), ("space_name", "string"), ("cash", "int64"),
+    ("net_worth", "int64"), ("properties_owned", "int16"), ("in_jail", "bool"),
+    ("decision", "string"), ("result", "string"), ("victory_status", "string")
+]
+
+LOGGER_SCHEMA = [
+    ("game_id", "int32"), ("turn_number", "int32"), ("player_id", "int8"),
+    ("total_players", "int8"), ("position", "int8"), ("cash", "int64"),
+    ("bank_cash", "int64"), ("net_worth", "int64"), ("properties_owned", "int16"),
+    ("in_jail", "int8"), ("action_taken", "string"), ("result_outcome", "string"),
+    ("game_winner", "int8")
+]
+
+FORMATS = {".csv": "csv", ".parquet": "parquet"}
+ROW_GROUP_ROWS = 100_000  # Rows per Parquet row group: large groups compress and scan well
+
+def detect_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Unknown output format for {path} (expected one of {list(FORMATS)})")
+    return FORMATS[ext]
+
+class CsvRowWriter:
+    """Text CSV. In append mode the header is only written to a new/empty file."""
+
+    def __init__(self, path: str, schema: list, append: bool = False):
+        self.columns = [name for name, _ in schema]
+        write_header = not (append and os.path.isfile(path) and os.path.getsize(path) > 0)
+        self.file = open(path, mode='a' if append else 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        if write_header:
+            self.writer.writerow(self.columns)
+
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self, sync: bool = False):
+        """Closes the file; with sync=True it is fsynced to disk first."""
+        if sync:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        self.file.close()
+
+class ParquetRowWriter:
+    """
+    Streams rows into a Parquet file as typed, compressed row groups.
+    Rows are gathered per column and written every `row_group_size` rows,
+    so memory stays bounded no matter how long the run is.
+    """
+
+    def __init__(self, path: str, schema: list, row_group_size: int = ROW_GROUP_ROWS,
+                 compression: str = "zstd"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.columns = [name for name, _ in schema]
+        self.schema = pa.schema([(name, getattr(pa, _ARROW_TYPES[kind])()) for name, kind in schema])
+        strings = [name for name, kind in schema if kind == "string"]
+        self.file = open(path, 'wb')
+        self.writer = pq.ParquetWriter(self.file, self.schema, compression=compression,
+                                       use_dictionary=strings)
+        self.row_group_size = row_group_size
+        self.pending = [[] for _ in self.columns]
+        self.pending_rows = 0
+
+    def write_rows(self, rows):
+        pending = self.pending
+        for row in rows:
+            for column, value in zip(pending, row):
+                column.append(value)
+        self.pending_rows += len(rows)
+        if self.pending_rows >= self.row_group_size:
+            self._write_group()
+
+    def write_table(self, table):
+        """Appends an Arrow table (e.g. a finished part) as-is."""
+        self._write_group()
+        self.writer.write_table(table.select(self.columns).cast(self.schema))
+
+    def _write_group(self):
+        if not self.pending_rows:
+            return
+        arrays = [self.pa.array(values, type=field.type) for values, field in zip(self.pending, self.schema)]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema),
+                                row_group_size=self.row_group_size)
+        self.pending = [[] for _ in self.columns]
+        self.pending_rows = 0
+
+    def flush(self):
+        """
+        Pushes finished row groups to the OS. Pending rows stay buffered until a full group
+        (or close()): a row group per flush would leave many tiny groups, and the file is
+        not readable before its footer is written anyway.
+        """
+        self.file.flush()
+
+    def close(self, sync: bool = False):
+        """Writes the last row group and the footer; with sync=True the file is fsynced."""
+        self._write_group()
+        self.writer.close()
+        if sync:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        self.file.close()
+
+def open_writer(path: str, schema: list, fmt: str = None, append: bool = False, **options):
+    """
+    Returns a RowWriter for `path`. The format comes from the extension unless `fmt` is given.
+    Parquet files cannot be appended to, so `append` only applies to CSV.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt == "csv":
+        return CsvRowWriter(path, schema, append=append)
+    if fmt == "parquet":
+        return ParquetRowWriter(path, schema, **options)
+    raise ValueError(f"Unknown output format: {fmt}")
+
+def concat_files(parts: list, output_file: str, schema: list, fmt: str = None):
+    """Concatenates finished part files (same format) in the given order into one file."""
+    fmt = fmt or detect_format(output_file)
+    if fmt == "csv":
+        import shutil
+        with open(output_file, mode='w', newline='', encoding='utf-8') as out:
+            for i, path in enumerate(parts):
+                with open(path, mode='r', newline='', encoding='utf-8') as part:
+                    if i:
+                        part.readline()  # Header is kept from the first part only
+                    shutil.copyfileobj(part, out)
+        return
+
+    import pyarrow.parquet as pq
+    writer = open_writer(output_file, schema, fmt="parquet")
+    for path in parts:
+        # Row groups are copied one at a time, never the whole part
+        part = pq.ParquetFile(path)
+        for i in range(part.num_row_groups):
+            writer.write_table(part.read_row_group(i))
+    writer.close()
+
+def read_table(path: str, columns: list = None, filters=None):
+    """
+    Reads a Parquet log as an Arrow table: only `columns`, and only the rows matching
+    `filters` (pyarrow.parquet filter tuples, e.g. [('game_id', '=', 7)]). Nothing is
+    turned into Python objects, so prefer this over read_rows for Parquet files.
+    """
+    import pyarrow.parquet as pq
+    return pq.read_table(path, columns=columns, filters=filters)
+
+def read_rows(path: str, columns: list = None):
+    """
+    Yields rows as dicts from a CSV or Parquet log. Parquet values come back typed;
+    CSV values are strings, as csv.DictReader gives them. One dict per row is slow on
+    large files: use read_table for Parquet.
+    """
+    if detect_format(path) == "csv":
+        with open(path, mode='r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                yield row if columns is None else {c: row[c] for c in columns}
+        return
+
+    import pyarrow.parquet as pq
+    for batch in pq.ParquetFile(path).iter_batches(columns=columns):
+        yield from batch.to_pylist()